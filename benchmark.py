@@ -0,0 +1,192 @@
+"""hrv_analysis ve utils sıcak yolları için performans ölçümü ve gerileme denetimi.
+
+Deterministik sentetik RR serileri (1k, 10k, 100k, 1M atım) üretilir; her adım
+için duvar saati süresi ve tepe bellek (tracemalloc) ölçülür. Sonuçlar JSON
+temel çizgisi olarak kaydedilebilir; sonraki çalıştırmalar temel çizgiye göre
+eşik üzerinde yavaşlayan veya bellek kullanımı artan adımlarda başarısız olur.
+
+Kullanım:
+    python benchmark.py --save-baseline              # temel çizgiyi kaydet
+    python benchmark.py                              # temel çizgiyle karşılaştır
+    python benchmark.py --sizes 1000 10000 --threshold 0.5
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from hrv_analysis import (validate_rr_data, calculate_time_domain_parameters, calculate_frequency_domain_parameters,
+                          calculate_dfa)
+from synthetic_rr import generate_rr
+from utils import (load_rr_intervals, create_tachogram, create_psd_plot, create_dfa_plot, figure_to_html,
+                   generate_report, process_multiple_files)
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+
+# Göreli gerileme eşiği (0.25 = %25 yavaşlama veya bellek artışı)
+DEFAULT_THRESHOLD = 0.25
+
+# Bu süreden kısa ölçümlerde zamanlama gürültüsü baskındır; süre karşılaştırması atlanır
+MIN_COMPARABLE_SEC = 0.005
+
+# Bu boyuttan küçük tepe bellek değerleri karşılaştırılmaz (yorumlayıcı gürültüsü)
+MIN_COMPARABLE_BYTES = 1 << 20
+
+# Toplu işlemde kullanılan kayıt sayısı
+BATCH_RECORDS = 4
+
+
+class _UploadedFile(io.BytesIO):
+    """Streamlit file_uploader nesnesinin getvalue()/name arayüzünü taklit eder."""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def _synthetic_rr(n_beats, seed=0):
+    """Deterministik, tam sayı ms'ye yuvarlanmış sentetik RR serisi."""
+    rr_intervals, _ = generate_rr(n_beats=n_beats, fractal_power=200.0, seed=seed)
+    return rr_intervals.round()
+
+
+def _to_text(rr_intervals):
+    return '\n'.join(f'{value:.0f}' for value in rr_intervals).encode('utf-8')
+
+
+def _report(rr_intervals):
+    time_params = calculate_time_domain_parameters(rr_intervals)
+    freq_params, (freqs, psd) = calculate_frequency_domain_parameters(rr_intervals)
+    dfa_params, (scales_log, fluct_log) = calculate_dfa(rr_intervals)
+    psd_html = figure_to_html(create_psd_plot(freqs, psd))
+    dfa_html = figure_to_html(create_dfa_plot(scales_log, fluct_log))
+    total_time_min = np.sum(rr_intervals, dtype=np.float64) / 60000
+    return generate_report(time_params, freq_params, dfa_params, total_time_min, psd_html, dfa_html)
+
+
+# Adım adı -> (hazırlık, ölçülen işlev, bu adım için en büyük atım sayısı)
+# Hazırlık (ör. dosya metni üretimi) ölçüme dahil değildir. DFA ölçek başına
+# bölüm döngüsü kullandığından DFA içeren adımlar daha küçük boyutlarla sınırlıdır.
+BENCHMARKS = {
+    'load_rr_intervals': (lambda rr: _UploadedFile(_to_text(rr), 'rr.txt'),
+                          load_rr_intervals, 1_000_000),
+    'validate_rr_data': (lambda rr: rr, validate_rr_data, 1_000_000),
+    'calculate_time_domain_parameters': (lambda rr: rr, calculate_time_domain_parameters, 1_000_000),
+    'calculate_frequency_domain_parameters': (lambda rr: rr, calculate_frequency_domain_parameters, 1_000_000),
+    'calculate_dfa': (lambda rr: rr, calculate_dfa, 100_000),
+    'create_tachogram': (lambda rr: rr, create_tachogram, 1_000_000),
+    'generate_report': (lambda rr: rr, _report, 100_000),
+    'process_multiple_files': (lambda rr: [_UploadedFile(_to_text(rr), f'rr_{i}.txt') for i in range(BATCH_RECORDS)],
+                               process_multiple_files, 10_000),
+}
+
+
+def _rewind(arg):
+    """Dosya nesnelerini tekrar okunabilir hale getir."""
+    for item in arg if isinstance(arg, list) else [arg]:
+        if isinstance(item, io.IOBase):
+            item.seek(0)
+    return arg
+
+
+def measure(func, arg, repeat=3):
+    """En iyi duvar saati süresini (s) ve tepe belleği (bayt) döndür.
+
+    tracemalloc süreyi şişirdiği için bellek ayrı bir çalıştırmada ölçülür.
+    """
+    wall = []
+    for _ in range(repeat):
+        _rewind(arg)
+        start = time.perf_counter()
+        func(arg)
+        wall.append(time.perf_counter() - start)
+
+    _rewind(arg)
+    tracemalloc.start()
+    try:
+        func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return min(wall), peak
+
+
+def run(sizes=SIZES, names=None, repeat=3):
+    """Seçilen adımları tüm boyutlarda ölç; {adım: {boyut: {...}}} döndür."""
+    results = {}
+    for n_beats in sizes:
+        rr_intervals = _synthetic_rr(n_beats)
+        for name, (setup, func, max_beats) in BENCHMARKS.items():
+            if names and name not in names:
+                continue
+            if n_beats > max_beats:
+                continue
+            wall, peak = measure(func, setup(rr_intervals), repeat=repeat)
+            results.setdefault(name, {})[str(n_beats)] = {'wall_sec': wall, 'peak_bytes': peak}
+            print(f"{name:<40} {n_beats:>9} atım  {wall * 1000:10.1f} ms  {peak / 2**20:9.1f} MiB", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Temel çizgiye göre eşiği aşan gerilemelerin açıklama listesini döndür."""
+    regressions = []
+    for name, by_size in results.items():
+        for size, current in by_size.items():
+            reference = baseline.get(name, {}).get(size)
+            if reference is None:
+                continue
+            if (reference['wall_sec'] >= MIN_COMPARABLE_SEC
+                    and current['wall_sec'] > reference['wall_sec'] * (1 + threshold)):
+                regressions.append(f"{name} [{size}]: süre {reference['wall_sec'] * 1000:.1f} ms -> "
+                                   f"{current['wall_sec'] * 1000:.1f} ms")
+            if (reference['peak_bytes'] >= MIN_COMPARABLE_BYTES
+                    and current['peak_bytes'] > reference['peak_bytes'] * (1 + threshold)):
+                regressions.append(f"{name} [{size}]: bellek {reference['peak_bytes'] / 2**20:.1f} MiB -> "
+                                   f"{current['peak_bytes'] / 2**20:.1f} MiB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='Yalnızca bu adımları ölç')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='Sonuçları temel çizgi olarak kaydet')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.only, args.repeat)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nTemel çizgi kaydedildi: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nTemel çizgi bulunamadı ({args.baseline}); karşılaştırma atlandı.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n%{args.threshold * 100:.0f} eşiğini aşan gerilemeler:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+
+    print("\nGerileme yok.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
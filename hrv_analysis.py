@@ -1,88 +1,518 @@
 import numpy as np
 from scipy import signal
-from scipy.interpolate import interp1d
-import warnings
+from scipy.interpolate import CubicSpline, PchipInterpolator
+from scipy.spatial import cKDTree
+from scipy import fft as sp_fft
+from functools import lru_cache, cached_property
+from numpy.lib.stride_tricks import sliding_window_view
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+import pandas as pd
+from instrumentation import span, timed
 import streamlit as st
 
-def validate_rr_data(rr_intervals):
-    """RR aralıklarını doğrula."""
-    if not isinstance(rr_intervals, (list, np.ndarray)):
-        return False, "RR aralıkları liste veya numpy dizisi olmalıdır."
+@dataclass
+class QualityReport:
+    """RR verisinin tek geçişte hesaplanan kalite raporu."""
+    n_total: int
+    n_nonpositive: int
+    n_out_of_range: int
+    n_nan: int
+    longest_gap: int  # art arda gelen geçersiz atımların en uzun dizisi
+    valid_percent: float
+    is_valid: bool
+    message: str
+
+    def to_dict(self):
+        """Arayüz ve toplu sonuç tabloları için etiketli sözlük döndür."""
+        return {
+            'Toplam Atım': self.n_total,
+            'Pozitif Olmayan': self.n_nonpositive,
+            'Aralık Dışı (300-2000 ms)': self.n_out_of_range,
+            'NaN/Sonsuz': self.n_nan,
+            'En Uzun Geçersiz Dizi (atım)': self.longest_gap,
+            'Geçerli Veri (%)': self.valid_percent
+        }
+
+@dataclass(frozen=True)
+class HRVConfig:
+    """Analiz ayarları.
+
+    Welch parametreleri saniye cinsinden sabittir; nfft ile sıfır doldurma yapıldığından
+    aynı ayarla analiz edilen tüm kayıtlar aynı frekans ızgarasını paylaşır ve
+    PSD'leri tek bir matriste birleştirilebilir.
+    """
+    fs: float = 4.0
+    vlf_range: tuple = (0.003, 0.04)
+    lf_range: tuple = (0.04, 0.15)
+    hf_range: tuple = (0.15, 0.4)
+    welch_segment_sec: float = 256.0
+    welch_overlap: float = 0.5
+    welch_window: str = 'hann'
+    welch_nfft: int = 2048
+    precision: str = 'float64'
+
+PRECISION_DTYPES = {'float64': np.float64, 'float32': np.float32, 'uint16': np.uint16}
+
+class RRSeries:
+    """RR aralıklarını seçilen hassasiyette saklayan kapsayıcı.
+
+    'float32' ve 'uint16' (tam sayı ms) modları depolamayı yarıya/dörtte bire
+    indirir. Analiz fonksiyonları diziyi bu türde kullanır; yalnızca toplam ve
+    varyans gibi birikimli işlemler float64'te yapılır.
+    """
+
+    def __init__(self, values, precision='float64'):
+        if precision not in PRECISION_DTYPES:
+            raise ValueError(f"Bilinmeyen hassasiyet modu: {precision}")
+        self.precision = precision
+        if precision == 'uint16':
+            values = np.clip(np.rint(np.asarray(values, dtype=float)), 0, np.iinfo(np.uint16).max)
+        self.values = np.asarray(values, dtype=PRECISION_DTYPES[precision])
+
+    def __len__(self):
+        return len(self.values)
+
+    def __array__(self, dtype=None):
+        # Farklar negatif olabildiğinden tam sayı depolama hesapta float32'ye açılır
+        values = self.values.astype(np.float32) if self.values.dtype == np.uint16 else self.values
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+def _as_rr_array(rr_intervals):
+    """Analiz dizisini döndür: float32/uint16 girişler float32 kalır, diğerleri float64 olur."""
+    if isinstance(rr_intervals, RecordContext):
+        return rr_intervals.rr
+    if isinstance(rr_intervals, RRSeries):
+        return np.asarray(rr_intervals)
+    if isinstance(rr_intervals, np.ndarray) and rr_intervals.dtype in (np.float32, np.uint16):
+        return rr_intervals.astype(np.float32, copy=False)
+    return np.asarray(rr_intervals, dtype=float)
+
+@timed()
+def validate_rr_data(rr_intervals, low=300, high=2000, min_beats=100):
+    """RR aralıklarını doğrula ve kalite raporu döndür.
+
+    Tüm sayımlar aynı boolean maskeler üzerinden tek geçişte hesaplanır.
+    """
+    if not isinstance(rr_intervals, (list, np.ndarray, RRSeries)):
+        return QualityReport(0, 0, 0, 0, 0, 0.0, False,
+                             "RR aralıkları liste veya numpy dizisi olmalıdır.")
     
-    rr_intervals = np.array(rr_intervals)
+    rr_intervals = _as_rr_array(rr_intervals)
+    n_total = len(rr_intervals)
     
-    if len(rr_intervals) < 100:
-        return False, "En az 100 RR aralığı gereklidir."
+    not_finite = ~np.isfinite(rr_intervals)
+    with np.errstate(invalid='ignore'):
+        nonpositive = rr_intervals <= 0
+        out_of_range = ~nonpositive & ~not_finite & ((rr_intervals < low) | (rr_intervals > high))
+    invalid = not_finite | nonpositive | out_of_range
     
-    if np.any(rr_intervals <= 0):
-        return False, "Tüm RR aralıkları pozitif olmalıdır."
+    n_nan = int(np.count_nonzero(not_finite))
+    n_nonpositive = int(np.count_nonzero(nonpositive))
+    n_out_of_range = int(np.count_nonzero(out_of_range))
+    n_invalid = int(np.count_nonzero(invalid))
     
-    if np.any(rr_intervals > 2000) or np.any(rr_intervals < 300):
-        return False, "RR aralıkları 300-2000 ms aralığında olmalıdır."
+    # En uzun geçersiz dizi: maskedeki 0->1 ve 1->0 geçişlerinin farkı
+    edges = np.diff(np.concatenate(([0], invalid.view(np.int8), [0])))
+    runs = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    longest_gap = int(runs.max()) if len(runs) else 0
+    
+    valid_percent = round((n_total - n_invalid) / n_total * 100, 2) if n_total else 0.0
+    
+    if n_total < min_beats:
+        is_valid, message = False, f"En az {min_beats} RR aralığı gereklidir."
+    elif n_nan:
+        is_valid, message = False, f"RR aralıklarında {n_nan} adet sayısal olmayan değer var."
+    elif n_nonpositive:
+        is_valid, message = False, f"Tüm RR aralıkları pozitif olmalıdır ({n_nonpositive} geçersiz değer)."
+    elif n_out_of_range:
+        is_valid, message = False, (f"RR aralıkları {low}-{high} ms aralığında olmalıdır "
+                                    f"({n_out_of_range} değer aralık dışında).")
+    else:
+        is_valid, message = True, "Veri doğrulama başarılı."
     
-    return True, "Veri doğrulama başarılı."
+    return QualityReport(n_total, n_nonpositive, n_out_of_range, n_nan, longest_gap,
+                         valid_percent, is_valid, message)
+
+@timed()
+def _rolling_quartile_deviation(x, width, chunk_rows=4096):
+    """Her tam kayan penceredeki çeyrek sapma ((Q3 - Q1) / 2).
+
+    Çeyrekler np.percentile ile aynı doğrusal interpolasyonla, yalnızca gereken
+    sıra istatistikleri np.partition ile yerleştirilerek bulunur. Pencere
+    matrisinin kopyası bellekte parça parça tutulur.
+    """
+    windows = sliding_window_view(x, width)
+    # (alt sıra, üst sıra, kesir) çiftleri: Q1 ve Q3
+    bounds = [(int(np.floor(pos)), int(np.ceil(pos)), pos - np.floor(pos))
+              for pos in (0.25 * (width - 1), 0.75 * (width - 1))]
+    ranks = sorted({rank for lower, upper, _ in bounds for rank in (lower, upper)})
+
+    qd = np.empty(len(windows))
+    for start in range(0, len(windows), chunk_rows):
+        part = np.partition(windows[start:start + chunk_rows], ranks, axis=1)
+        q1, q3 = (part[:, lower] + frac * (part[:, upper] - part[:, lower]) for lower, upper, frac in bounds)
+        qd[start:start + chunk_rows] = (q3 - q1) / 2
+    return qd
+
+def correct_artifacts(rr_intervals, method='interpolate', low=300, high=2000,
+                      median_window=11, threshold_window=91, threshold_factor=5.2,
+                      min_threshold_ratio=0.15):
+    """Ektopik atımları ve artefaktları tespit edip düzelt.
+
+    İki ölçüt birlikte kullanılır: fizyolojik aralık (low-high ms) dışındaki
+    değerler ve yerel medyandan sapması uyarlamalı eşiği aşan atımlar
+    (Lipponen-Tarvainen tarzı, eşik = threshold_factor x çeyrek sapma; eşik
+    yerel medyanın min_threshold_ratio katından küçük olamaz). Çeyrek sapma her
+    atımı merkezleyen threshold_window atımlık kayan pencerede hesaplanır; kayıt
+    kenarlarında pencere kayıt içinde kalacak şekilde kaydırılır.
+    Medyan, kayan pencere görünümü üzerinde tek np.partition çağrısıyla alınır.
 
+    method: 'interpolate' işaretli atımları komşu geçerli atımlardan doğrusal
+    interpolasyonla değiştirir, 'remove' ise bunları çıkarır.
+    Düzeltilmiş RR dizisi ve düzeltme özeti döndürülür.
+    """
+    if method not in ('interpolate', 'remove'):
+        raise ValueError(f"Bilinmeyen artefakt düzeltme yöntemi: {method}")
+    rr = _as_rr_array(rr_intervals)
+    n = len(rr)
+    if n == 0:
+        return rr, {'Düzeltilen Atım Sayısı': 0, 'Düzeltilen Atım (%)': 0.0}
+
+    # Eşik tabanlı tespit
+    flags = ~np.isfinite(rr) | (rr < low) | (rr > high)
+
+    # Kayan medyan (kenarlar en yakın değerle doldurulur). Sayısal olmayan değerler zaten
+    # işaretlidir; sapma doldurulmuş seriden alınır, aksi halde NaN bloğun eşiğini bozar
+    half = median_window // 2
+    filled = np.where(np.isfinite(rr), rr, np.nanmedian(rr))
+    padded = np.pad(filled, half, mode='edge')
+    windows = sliding_window_view(padded, 2 * half + 1)
+    local_median = np.partition(windows, half, axis=1)[:, half]
+    deviation = filled - local_median
+
+    # Uyarlamalı eşik: atımı merkezleyen kayan pencerede çeyrek sapma (QD)
+    width = min(threshold_window, n)
+    qd = _rolling_quartile_deviation(deviation, width)
+    window_start = np.clip(np.arange(n) - width // 2, 0, n - width)
+    threshold = np.maximum(threshold_factor * qd[window_start], min_threshold_ratio * local_median)
+
+    flags |= np.abs(deviation) > threshold
+    n_flagged = int(np.count_nonzero(flags))
+
+    if n_flagged and method == 'interpolate':
+        valid = np.flatnonzero(~flags)
+        corrected = rr.copy()
+        if len(valid) > 0:
+            corrected[flags] = np.interp(np.flatnonzero(flags), valid, rr[valid])
+    elif n_flagged:
+        corrected = rr[~flags]
+    else:
+        corrected = rr
+
+    report = {
+        'Düzeltilen Atım Sayısı': n_flagged,
+        'Düzeltilen Atım (%)': round(n_flagged / n * 100, 2)
+    }
+    return corrected, report
+
+def _rr_histogram(rr_intervals, bin_width=7.8125):
+    """RR histogramını 7.8125 ms (1/128 s) kutu genişliğiyle hesapla."""
+    bins = np.arange(float(np.min(rr_intervals)), float(np.max(rr_intervals)) + bin_width, bin_width)
+    hist, _ = np.histogram(rr_intervals, bins=bins)
+    return hist, bins
+
+def _calculate_tinn(hist, bin_width=7.8125):
+    """TINN: histograma en küçük kareler anlamında en iyi oturan üçgenin taban genişliği.
+
+    Üçgen q(t), N ve M noktalarında sıfır, histogramın tepe noktası X'te Y'dir.
+    Hata terimi sol (N'ye bağlı) ve sağ (M'ye bağlı) kısımlara ayrılır; her aday
+    için hata D, t·D ve D² ön toplamlarından O(1)'de hesaplanır ve tüm (N, M)
+    çiftleri tek bir matris üzerinde puanlanır.
+    """
+    # Histogramın iki yanına boş kutu ekle; üçgen histogram dışından başlayabilsin
+    d = np.concatenate(([0.0], hist.astype(float), [0.0]))
+    t = np.arange(len(d), dtype=float)
+    x = int(np.argmax(d))
+    y = d[x]
+
+    def prefix(values):
+        return np.concatenate(([0.0], np.cumsum(values)))
+
+    p_d, p_td, p_d2 = prefix(d), prefix(t * d), prefix(d * d)
+
+    def range_sum(p, start, stop):
+        # [start, stop] kapalı aralığındaki toplam
+        return p[stop + 1] - p[start]
+
+    def sum_squares(k):
+        return k * (k + 1) * (2 * k + 1) / 6
+
+    # Sol kenar: t <= N'de q = 0, N < t <= X'te q = Y(t - N)/(X - N)
+    n = np.arange(0, x)
+    length = x - n
+    a = y / length
+    left = (range_sum(p_d2, 0, n)
+            + range_sum(p_d2, n + 1, x)
+            - 2 * a * (range_sum(p_td, n + 1, x) - n * range_sum(p_d, n + 1, x))
+            + a ** 2 * sum_squares(length))
+
+    # Sağ kenar: X <= t < M'de q = Y(M - t)/(M - X), t >= M'de q = 0
+    m = np.arange(x + 1, len(d))
+    length = m - x
+    b = y / length
+    right = (range_sum(p_d2, x, m - 1)
+             - 2 * b * (m * range_sum(p_d, x, m - 1) - range_sum(p_td, x, m - 1))
+             + b ** 2 * sum_squares(length)
+             + range_sum(p_d2, m, len(d) - 1))
+
+    cost = left[:, None] + right[None, :]
+    best_n, best_m = np.unravel_index(np.argmin(cost), cost.shape)
+    return (m[best_m] - n[best_n]) * bin_width
+
+@timed()
 def calculate_time_domain_parameters(rr_intervals):
-    """Zaman alanı parametrelerini hesapla."""
-    rr_intervals = np.array(rr_intervals)
+    """Zaman alanı parametrelerini hesapla.
+
+    float32 girişlerde toplam ve varyanslar float64'te biriktirilir.
+    """
+    context = as_record_context(rr_intervals)
+    rr_intervals = context.rr
     
     # Ortalama kalp hızı
-    mean_rr = np.mean(rr_intervals)
+    mean_rr = np.mean(rr_intervals, dtype=np.float64)
     mean_hr = 60000 / mean_rr
     
     # SDNN
-    sdnn = np.std(rr_intervals)
+    sdnn = np.std(rr_intervals, dtype=np.float64)
     
     # RMSSD
-    rmssd = np.sqrt(np.mean(np.diff(rr_intervals) ** 2))
+    rmssd = np.sqrt(np.mean(context.diffs ** 2, dtype=np.float64))
     
     # pNN50
-    nn50 = np.sum(np.abs(np.diff(rr_intervals)) > 50)
+    nn50 = np.count_nonzero(context.abs_diffs > 50)
     pnn50 = (nn50 / len(rr_intervals)) * 100
     
     # Stress İndeksi (SI) hesaplama
-    bins = np.arange(min(rr_intervals), max(rr_intervals) + 7.8125, 7.8125)
-    hist, _ = np.histogram(rr_intervals, bins=bins)
+    bin_width = 7.8125
+    hist, bins = context.histogram
     mode_bin_idx = np.argmax(hist)
     mode_rr = (bins[mode_bin_idx] + bins[mode_bin_idx + 1]) / 2
     
     amo = (hist[mode_bin_idx] / len(rr_intervals)) * 100
-    mxdmn = max(rr_intervals) - min(rr_intervals)
+    mxdmn = float(np.max(rr_intervals)) - float(np.min(rr_intervals))
     si = (amo / (2 * mode_rr * mxdmn)) * 1000000  # 1000000 ile çarparak düzeltme
     
+    # Geometrik parametreler aynı histogramdan hesaplanır
+    hrv_ti = len(rr_intervals) / hist[mode_bin_idx]
+    tinn = _calculate_tinn(hist, bin_width)
+    
     return {
         'Ortalama KH (atım/dk)': round(mean_hr, 2),
         'SDNN (ms)': round(sdnn, 2),
         'RMSSD (ms)': round(rmssd, 2),
         'pNN50 (%)': round(pnn50, 2),
-        'Stress İndeksi': round(si, 2)
+        'Stress İndeksi': round(si, 2),
+        'HRV Üçgen İndeksi': round(hrv_ti, 2),
+        'TINN (ms)': round(tinn, 2)
     }
 
+class RRResampler:
+    """RR serisini düzenli örneklenmiş seriye dönüştüren, kayıt başına bir kez kurulan motor.
+
+    Spline katsayıları yapıcıda bir kez hesaplanır; herhangi bir zaman aralığı ve
+    örnekleme frekansı için değerlendirme parça parça (chunk) yapılır. Bölge
+    yeniden analizleri ve kayan pencereler aynı katsayıları kullanır.
+
+    kind: 'cubic' (not-a-knot kübik spline, önceki interp1d ile aynı),
+    'monotone' (PCHIP, aşım yapmaz) veya 'linear'.
+    """
+
+    @timed('RRResampler')
+    def __init__(self, rr_intervals, kind='cubic', time=None):
+        rr_intervals = _as_rr_array(rr_intervals)
+        # time: önceden hesaplanmış atım zamanları (s), ör. RecordContext.times
+        self.time = np.cumsum(rr_intervals, dtype=np.float64) / 1000.0 if time is None else time
+        self.kind = kind
+        if kind == 'cubic':
+            self._interpolator = CubicSpline(self.time, rr_intervals)
+        elif kind == 'monotone':
+            self._interpolator = PchipInterpolator(self.time, rr_intervals)
+        elif kind == 'linear':
+            self._values = rr_intervals
+            self._interpolator = lambda t: np.interp(t, self.time, self._values)
+        else:
+            raise ValueError(f"Bilinmeyen interpolasyon türü: {kind}")
+
+    def _bounds(self, start, end):
+        start = self.time[0] if start is None else max(start, self.time[0])
+        end = self.time[-1] if end is None else min(end, self.time[-1])
+        return start, end
+
+    def n_samples(self, fs=4.0, start=None, end=None):
+        """[start, end) aralığında fs Hz'de üretilecek örnek sayısı."""
+        start, end = self._bounds(start, end)
+        return max(int(np.ceil((end - start) * fs)), 0)
+
+    def iter_chunks(self, fs=4.0, start=None, end=None, chunk_size=65536):
+        """Yeniden örneklenmiş seriyi (zaman, değer) parçaları halinde üret."""
+        start, _ = self._bounds(start, end)
+        n = self.n_samples(fs, start, end)
+        for first in range(0, n, chunk_size):
+            t = start + np.arange(first, min(first + chunk_size, n)) / fs
+            yield t, self._interpolator(t)
+
+    @timed('RRResampler.resample')
+    def resample(self, fs=4.0, start=None, end=None):
+        """İstenen aralığı tek dizi olarak döndür."""
+        chunks = [values for _, values in self.iter_chunks(fs, start, end)]
+        return np.concatenate(chunks) if chunks else np.array([])
+
+@timed()
+def _resample_rr(rr_intervals, fs=4.0):
+    """RR aralıklarını kübik interpolasyonla fs Hz'de düzenli örneklenmiş seriye dönüştür."""
+    return RRResampler(rr_intervals).resample(fs)
+
+class RecordContext:
+    """Bir kaydın analizleri arasında paylaşılan, tembel hesaplanan ara sonuçlar.
+
+    Analiz fonksiyonları RR dizisi yerine bu nesneyi de kabul eder; dizi, ardışık
+    farklar, kümülatif zamanlar ve yeniden örneklenmiş seri ilk kullanımda bir kez
+    hesaplanır. resampler verilirse (tüm kayıt için kurulmuş RRResampler)
+    yeniden örnekleme [start, end] aralığından yapılır.
+    """
+
+    def __init__(self, rr_intervals, fs=4.0, kind='cubic', resampler=None, start=None, end=None):
+        self.source = rr_intervals
+        self.fs = fs
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self._resampler = resampler
+
+    def __len__(self):
+        return len(self.rr)
+
+    def __array__(self, dtype=None):
+        return self.rr if dtype is None else self.rr.astype(dtype, copy=False)
+
+    @cached_property
+    def rr(self):
+        return _as_rr_array(self.source)
+
+    @cached_property
+    def diffs(self):
+        return np.diff(self.rr)
+
+    @cached_property
+    def abs_diffs(self):
+        return np.abs(self.diffs)
+
+    @cached_property
+    def times(self):
+        """Atım zamanları (s), float64 birikimli."""
+        return np.cumsum(self.rr, dtype=np.float64) / 1000.0
+
+    @cached_property
+    def histogram(self):
+        """Varsayılan 7.8125 ms kutulu RR histogramı: (sayımlar, kutu kenarları)."""
+        return _rr_histogram(self.rr)
+
+    @cached_property
+    def dfa_profile(self):
+        """DFA profili: ortalamadan sapmaların kümülatif toplamı (float64)."""
+        return np.cumsum(self.rr - np.mean(self.rr, dtype=np.float64), dtype=np.float64)
+
+    @cached_property
+    def resampler(self):
+        if self._resampler is not None:
+            return self._resampler
+        return RRResampler(self.rr, kind=self.kind, time=self.times)
+
+    @cached_property
+    def resampled(self):
+        return self.resampler.resample(self.fs, self.start, self.end)
+
+def as_record_context(rr_intervals):
+    """RR dizisini (veya RRSeries'i) RecordContext'e sar; zaten bağlamsa olduğu gibi döndür."""
+    if isinstance(rr_intervals, RecordContext):
+        return rr_intervals
+    return RecordContext(rr_intervals)
+
+@lru_cache(maxsize=16)
+def _spectral_window(window, nperseg):
+    """Pencere fonksiyonunu (ör. hann) bir kez üret ve aynı boyut için yeniden kullan."""
+    win = signal.get_window(window, nperseg)
+    win.setflags(write=False)
+    return win
+
+def _welch_nfft(config):
+    """Ayarın FFT boyutu: welch_nfft, segment daha uzunsa bir sonraki 2'nin kuvveti."""
+    nperseg = int(round(config.welch_segment_sec * config.fs))
+    return max(config.welch_nfft, 1 << (nperseg - 1).bit_length())
+
+@lru_cache(maxsize=64)
+def _welch_setup(config, n_samples):
+    """Welch segment boyutu, örtüşme, FFT boyutu ve pencere dizisini ayar başına önbelleğe al.
+
+    Kayıt segmentten kısaysa segment kayıt uzunluğuna indirilir; nfft değişmediği
+    için frekans ızgarası yine aynı kalır.
+    """
+    nperseg = min(int(round(config.welch_segment_sec * config.fs)), n_samples)
+    noverlap = int(round(nperseg * config.welch_overlap))
+    return nperseg, noverlap, _welch_nfft(config), _spectral_window(config.welch_window, nperseg)
+
+@lru_cache(maxsize=16)
+def welch_frequencies(config):
+    """Verilen ayarın ortak Welch frekans ızgarası (önbellekte paylaşıldığından salt okunur)."""
+    frequencies = sp_fft.rfftfreq(_welch_nfft(config), 1 / config.fs)
+    frequencies.setflags(write=False)
+    return frequencies
+
+def _band_power(frequencies, psd, band):
+    """PSD'yi verilen frekans bandında (ms²) integre et."""
+    mask = (frequencies >= band[0]) & (frequencies < band[1])
+    return np.trapz(psd[mask], frequencies[mask])
+
+@timed()
 def calculate_frequency_domain_parameters(rr_intervals, fs=4.0, vlf_range=(0.003, 0.04), 
-                                       lf_range=(0.04, 0.15), hf_range=(0.15, 0.4)):
-    """Frekans alanı parametrelerini hesapla."""
+                                       lf_range=(0.04, 0.15), hf_range=(0.15, 0.4),
+                                       rr_resampled=None, config=None, raise_errors=False):
+    """Frekans alanı parametrelerini hesapla.
+
+    rr_resampled verilirse (ör. RRResampler.resample ile) yeniden örnekleme atlanır.
+    config (HRVConfig) verilirse fs ve bant aralıkları ondan alınır. Hata durumunda
+    arayüzde hata gösterilip boş sonuç döner; raise_errors=True ise hata yükseltilir.
+    """
+    if config is None:
+        config = HRVConfig(fs=fs, vlf_range=tuple(vlf_range), lf_range=tuple(lf_range),
+                           hf_range=tuple(hf_range))
+    fs = config.fs
+    if rr_resampled is None and isinstance(rr_intervals, RecordContext) and rr_intervals.fs == fs:
+        rr_resampled = rr_intervals.resampled
+    
     try:
         # RR aralıklarını yeniden örnekle
-        rr_intervals = np.array(rr_intervals)
-        time = np.cumsum(rr_intervals) / 1000.0  # saniyeye çevir
-        
-        # Düzenli aralıklı zaman noktaları oluştur
-        t_interpol = np.arange(time[0], time[-1], 1/fs)
-        
-        # RR aralıklarını interpolasyon ile yeniden örnekle
-        f = interp1d(time, rr_intervals, kind='cubic')
-        rr_interpol = f(t_interpol)
+        rr_interpol = _resample_rr(rr_intervals, fs) if rr_resampled is None else np.asarray(rr_resampled)
         
         # Trend kaldırma
         rr_detrend = signal.detrend(rr_interpol)
         
-        # Güç spektral yoğunluğunu hesapla
-        frequencies, psd = signal.welch(rr_detrend, fs=fs, nperseg=len(rr_detrend)//2)
+        # Güç spektral yoğunluğunu hesapla (sabit segment, ortak frekans ızgarası)
+        nperseg, noverlap, nfft, window = _welch_setup(config, len(rr_detrend))
+        with span('welch'):
+            frequencies, psd = signal.welch(rr_detrend, fs=fs, window=window, nperseg=nperseg,
+                                            noverlap=noverlap, nfft=nfft)
         
         # Frekans bantlarındaki gücü hesapla
-        vlf_power = np.trapz(psd[(frequencies >= vlf_range[0]) & (frequencies < vlf_range[1])])
-        lf_power = np.trapz(psd[(frequencies >= lf_range[0]) & (frequencies < lf_range[1])])
-        hf_power = np.trapz(psd[(frequencies >= hf_range[0]) & (frequencies < hf_range[1])])
+        vlf_power = _band_power(frequencies, psd, config.vlf_range)
+        lf_power = _band_power(frequencies, psd, config.lf_range)
+        hf_power = _band_power(frequencies, psd, config.hf_range)
         total_power = vlf_power + lf_power + hf_power
         
         # Normalize edilmiş güçleri hesapla
@@ -103,16 +533,194 @@ def calculate_frequency_domain_parameters(rr_intervals, fs=4.0, vlf_range=(0.003
         return params, (frequencies, psd)
         
     except Exception as e:
+        if raise_errors:
+            raise
         st.error(f"Frekans alanı parametreleri hesaplanırken hata oluştu: {str(e)}")
         # Boş sonuç döndür ama None değil
         return {}, (np.array([]), np.array([]))
 
+@lru_cache(maxsize=16)
+def _detrend_basis(n_samples):
+    """Doğrusal trend için ortonormal taban (n x 2); izdüşüm matrisi Q @ Q.T'dir."""
+    t = np.arange(n_samples, dtype=float)
+    basis, _ = np.linalg.qr(np.column_stack((np.ones(n_samples), t)))
+    return basis
+
+@timed()
+def calculate_frequency_domain_parameters_batch(rr_matrix, config=None):
+    """Eşit uzunluklu, yeniden örneklenmiş pencerelerden oluşan matrisin spektral analizi.
+
+    rr_matrix (n_pencere, n_örnek) boyutundadır. Tüm satırlar paylaşılan izdüşüm
+    tabanıyla tek işlemde trendden arındırılır, Welch segmentleri kopyasız görünüm
+    olarak alınır ve tek bir rfft çağrısıyla dönüştürülür. Bant güçleri tek bir
+    kümülatif trapez integrali üzerinden indeks farkıyla okunur.
+    Bant güçleri DataFrame'i ve (frekanslar, PSD matrisi) döndürülür.
+    """
+    if config is None:
+        config = HRVConfig()
+    rr_matrix = np.atleast_2d(np.asarray(rr_matrix, dtype=float))
+    n_windows, n_samples = rr_matrix.shape
+    fs = config.fs
+
+    # Doğrusal trend kaldırma: X - (X Q) Qᵀ
+    basis = _detrend_basis(n_samples)
+    detrended = rr_matrix - (rr_matrix @ basis) @ basis.T
+
+    # Welch: segmentler (n_pencere, n_segment, nperseg) görünümü
+    nperseg, noverlap, nfft, window = _welch_setup(config, n_samples)
+    segments = sliding_window_view(detrended, nperseg, axis=1)[:, ::nperseg - noverlap]
+    segments = (segments - segments.mean(axis=2, keepdims=True)) * window
+    power = np.abs(sp_fft.rfft(segments, n=nfft, axis=2)) ** 2
+    psd = power.mean(axis=1) / (fs * np.sum(window ** 2))
+    psd[:, 1:(nfft + 1) // 2] *= 2  # tek taraflı spektrum
+    frequencies = welch_frequencies(config)
+
+    # Kümülatif trapez integrali; bant gücü = C[son indeks] - C[ilk indeks]
+    df = frequencies[1] - frequencies[0]
+    cumulative = np.zeros_like(psd)
+    np.cumsum((psd[:, 1:] + psd[:, :-1]) * (df / 2), axis=1, out=cumulative[:, 1:])
+    bands = (config.vlf_range, config.lf_range, config.hf_range)
+    first = np.array([np.searchsorted(frequencies, band[0], side='left') for band in bands])
+    last = np.array([np.searchsorted(frequencies, band[1], side='left') - 1 for band in bands])
+    band_power = np.where(last >= first, cumulative[:, last] - cumulative[:, first], 0.0)
+    vlf_power, lf_power, hf_power = band_power.T
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lf_hf_sum = lf_power + hf_power
+        lf_nu = np.where(lf_hf_sum > 0, lf_power / lf_hf_sum * 100, 0)
+        hf_nu = np.where(lf_hf_sum > 0, hf_power / lf_hf_sum * 100, 0)
+        lf_hf = np.where(hf_power > 0, lf_power / hf_power, 0)
+
+    results = pd.DataFrame({
+        'VLF Güç (ms²)': vlf_power,
+        'LF Güç (ms²)': lf_power,
+        'HF Güç (ms²)': hf_power,
+        'Toplam Güç (ms²)': band_power.sum(axis=1),
+        'LF/HF Oranı': lf_hf,
+        'LF (n.u.)': lf_nu,
+        'HF (n.u.)': hf_nu
+    }).round(2)
+
+    return results, (frequencies, psd)
+
+def iter_spectrogram(rr_resampled, fs=4.0, window_sec=120.0, step_sec=30.0, batch_size=64,
+                     window='hann'):
+    """Kısa zamanlı güç spektrumunu pencere grupları halinde üret.
+
+    rr_resampled bir dizi ya da (ör. RRResampler.iter_chunks'tan gelen) değer
+    parçalarının yinelenebiliridir; parçalar arasında yalnızca bir sonraki
+    pencerenin başından itibaren kalan örnekler tutulur. Pencereler
+    sliding_window_view ile kopyasız alınır; her seferinde yalnızca batch_size
+    pencere ortalamadan arındırılıp pencere fonksiyonuyla çarpılır ve tek bir
+    rfft çağrısıyla dönüştürülür. Bellek kullanımı O(pencere x batch)'tir.
+    Pencere dizisi ve FFT boyutu tüm gruplarda aynıdır (scipy.fft plan önbelleği
+    yeniden kullanılır). Her adımda (zamanlar, frekanslar, güç matrisi) döner.
+    """
+    if isinstance(rr_resampled, np.ndarray):
+        chunks = [rr_resampled]
+    else:
+        chunks = rr_resampled
+
+    nperseg = int(round(window_sec * fs))
+    step = max(int(round(step_sec * fs)), 1)
+    nfft = sp_fft.next_fast_len(nperseg)
+    win = _spectral_window(window, nperseg)
+    scale = 1.0 / (fs * np.sum(win ** 2))  # spektral yoğunluk ölçeklemesi
+    frequencies = sp_fft.rfftfreq(nfft, 1 / fs)
+
+    buffer = np.array([])
+    frame_index = 0
+    for chunk in chunks:
+        buffer = np.concatenate((buffer, np.asarray(chunk, dtype=float)))
+        if len(buffer) < nperseg:
+            continue
+
+        frames = sliding_window_view(buffer, nperseg)[::step]
+        for start in range(0, len(frames), batch_size):
+            batch = frames[start:start + batch_size]
+            batch = (batch - batch.mean(axis=1, keepdims=True)) * win
+            power = np.abs(sp_fft.rfft(batch, n=nfft, axis=1)) ** 2 * scale
+            # Tek taraflı spektrum: DC ve (çift nfft'de) Nyquist dışındaki bileşenler iki katı
+            power[:, 1:(nfft + 1) // 2] *= 2
+            times = (np.arange(frame_index, frame_index + len(batch)) * step + nperseg / 2) / fs
+            frame_index += len(batch)
+            yield times, frequencies, power
+
+        # Tüketilen pencereleri at; bir sonraki pencerenin başından itibaren sakla
+        buffer = buffer[len(frames) * step:]
+
+@timed()
+def calculate_time_frequency_parameters(rr_intervals, fs=4.0, window_sec=120.0, step_sec=30.0,
+                                        batch_size=64, lf_range=(0.04, 0.15), hf_range=(0.15, 0.4),
+                                        max_frequency=0.5, output_path=None, resampler=None,
+                                        start=None, end=None):
+    """Zaman-frekans (spektrogram) analizi ile LF/HF güç zaman serilerini hesapla.
+
+    resampler verilirse (kayıt başına kurulmuş RRResampler) [start, end] aralığı
+    parça parça değerlendirilir; yeniden örneklenmiş seri hiçbir zaman bütünüyle
+    bellekte tutulmaz. output_path verilirse spektrogram .npy dosyasına (memmap)
+    grup grup yazılır ve döndürülen matris diskteki bu dosyaya bakar.
+    """
+    if resampler is None and isinstance(rr_intervals, RecordContext):
+        resampler = rr_intervals.resampler
+        start = rr_intervals.start if start is None else start
+        end = rr_intervals.end if end is None else end
+    if resampler is None:
+        resampler = RRResampler(rr_intervals)
+    n_samples = resampler.n_samples(fs, start, end)
+    nperseg = int(round(window_sec * fs))
+    step = max(int(round(step_sec * fs)), 1)
+    n_frames = (n_samples - nperseg) // step + 1 if n_samples >= nperseg else 0
+    if n_frames <= 0:
+        return {}, (np.array([]), np.array([]), np.empty((0, 0)), np.array([]), np.array([]))
+
+    frequencies = sp_fft.rfftfreq(sp_fft.next_fast_len(nperseg), 1 / fs)
+    keep = frequencies <= max_frequency
+    df = frequencies[1] - frequencies[0]
+    lf_mask = (frequencies >= lf_range[0]) & (frequencies < lf_range[1])
+    hf_mask = (frequencies >= hf_range[0]) & (frequencies < hf_range[1])
+
+    shape = (n_frames, int(np.sum(keep)))
+    if output_path is not None:
+        spectrogram = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float32, shape=shape)
+    else:
+        spectrogram = np.empty(shape, dtype=np.float32)
+    times = np.empty(n_frames)
+    lf_series = np.empty(n_frames)
+    hf_series = np.empty(n_frames)
+
+    chunk_size = batch_size * step + nperseg
+    chunks = (values for _, values in resampler.iter_chunks(fs, start, end, chunk_size))
+
+    row = 0
+    for batch_times, _, power in iter_spectrogram(chunks, fs, window_sec, step_sec, batch_size):
+        rows = slice(row, row + len(batch_times))
+        spectrogram[rows] = power[:, keep]
+        times[rows] = batch_times
+        lf_series[rows] = np.sum(power[:, lf_mask], axis=1) * df
+        hf_series[rows] = np.sum(power[:, hf_mask], axis=1) * df
+        row += len(batch_times)
+
+    if output_path is not None:
+        spectrogram.flush()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lf_hf_series = np.where(hf_series > 0, lf_series / hf_series, np.nan)
+
+    params = {
+        'Pencere Sayısı': n_frames,
+        'Ortalama LF Güç (ms²)': round(float(np.mean(lf_series)), 2),
+        'Ortalama HF Güç (ms²)': round(float(np.mean(hf_series)), 2),
+        'Ortalama LF/HF Oranı': round(float(np.nanmean(lf_hf_series)), 2) if np.any(np.isfinite(lf_hf_series)) else 'N/A'
+    }
+
+    return params, (times, frequencies[keep], spectrogram, lf_series, hf_series)
+
+@timed()
 def calculate_dfa(rr_intervals, scale_min=4, scale_max=64):
     """Detrended Fluctuation Analysis hesapla."""
-    rr_intervals = np.array(rr_intervals)
-    
-    # Kümülatif toplam
-    y = np.cumsum(rr_intervals - np.mean(rr_intervals))
+    # Kümülatif toplam (profil her zaman float64'te biriktirilir)
+    y = as_record_context(rr_intervals).dfa_profile
     
     # Ölçek aralıklarını logaritmik olarak oluştur
     scales = np.logspace(np.log10(scale_min), np.log10(scale_max), 20, dtype=int)
@@ -160,4 +768,335 @@ def calculate_dfa(rr_intervals, scale_min=4, scale_max=64):
         'Alpha2': round(alpha2, 3) if not np.isnan(alpha2) else 'N/A'
     }
     
-    return params, (scales_log, fluct_log)
\ No newline at end of file
+    return params, (scales_log, fluct_log)
+
+@timed()
+def calculate_poincare(rr_intervals):
+    """Poincaré grafiği parametrelerini (SD1, SD2, SD1/SD2, elips alanı) hesapla.
+
+    RR(n) ve RR(n+1) aynı dizinin iki görünümüdür; varyans ve kovaryans nokta
+    çarpımlarından tek geçişte elde edilir, ara fark/toplam dizisi oluşturulmaz.
+    """
+    rr_intervals = _as_rr_array(rr_intervals)
+    rr_n = rr_intervals[:-1]
+    rr_n1 = rr_intervals[1:]
+    n = len(rr_n)
+
+    # Çarpım toplamları float32 girişte de float64'te biriktirilir (tampon, kopya değil)
+    def dot(a, b):
+        return np.einsum('i,i->', a, b, dtype=np.float64)
+
+    mean_n = rr_n.sum(dtype=np.float64) / n
+    mean_n1 = rr_n1.sum(dtype=np.float64) / n
+    var_n = dot(rr_n, rr_n) / n - mean_n ** 2
+    var_n1 = dot(rr_n1, rr_n1) / n - mean_n1 ** 2
+    cov = dot(rr_n, rr_n1) / n - mean_n * mean_n1
+
+    # SD1: özdeşlik doğrusuna dik, SD2: özdeşlik doğrusu boyunca yayılım
+    sd1 = np.sqrt(max((var_n + var_n1 - 2 * cov) / 2, 0.0))
+    sd2 = np.sqrt(max((var_n + var_n1 + 2 * cov) / 2, 0.0))
+    area = np.pi * sd1 * sd2
+
+    params = {
+        'SD1 (ms)': round(sd1, 2),
+        'SD2 (ms)': round(sd2, 2),
+        'SD1/SD2': round(sd1 / sd2, 3) if sd2 > 0 else 'N/A',
+        'Elips Alanı (ms²)': round(area, 2)
+    }
+
+    return params, (rr_n, rr_n1)
+
+@timed()
+def calculate_prsa(rr_intervals, half_window=15, max_change=0.05):
+    """PRSA (faz düzeltmeli sinyal ortalaması) ile yavaşlama (DC) ve hızlanma (AC) kapasitesi hesapla.
+
+    Çapa atımları boolean maske olarak seçilir (bir öncekine göre en fazla
+    max_change oranında uzayan/kısalan atımlar). Pencereler sliding_window_view
+    ile kopyasız çıkarılır ve maskeli ortalama ile tek adımda ortalanır.
+    """
+    rr_intervals = _as_rr_array(rr_intervals)
+    n = len(rr_intervals)
+    window = 2 * half_window
+    if n <= window:
+        return {'DC (ms)': 'N/A', 'AC (ms)': 'N/A'}, (np.array([]), np.array([]), np.array([]))
+
+    # Çapa maskeleri: i. atım, (i-1). atıma göre uzuyor (DC) veya kısalıyorsa (AC)
+    prev, cur = rr_intervals[:-1], rr_intervals[1:]
+    dc_anchor = np.zeros(n, dtype=bool)
+    ac_anchor = np.zeros(n, dtype=bool)
+    # Eşikler float64'te hesaplanır; float32'de (1 ± max_change) sınırdaki atımları kaydırır
+    dc_anchor[1:] = (cur > prev) & (cur <= np.multiply(prev, 1 + max_change, dtype=np.float64))
+    ac_anchor[1:] = (cur < prev) & (cur >= np.multiply(prev, 1 - max_change, dtype=np.float64))
+
+    # k. pencere rr[k : k + 2L] aralığıdır; çapa (k + L) konumundadır
+    windows = sliding_window_view(rr_intervals, window)
+    dc_rows = dc_anchor[half_window:n - half_window + 1]
+    ac_rows = ac_anchor[half_window:n - half_window + 1]
+
+    def prsa_curve(rows):
+        if not np.any(rows):
+            return np.full(window, np.nan)
+        return np.mean(windows, axis=0, where=rows[:, None], dtype=np.float64)
+
+    dc_curve = prsa_curve(dc_rows)
+    ac_curve = prsa_curve(ac_rows)
+
+    # DC/AC = [X(0) + X(1) - X(-1) - X(-2)] / 4
+    def capacity(curve):
+        return (curve[half_window] + curve[half_window + 1]
+                - curve[half_window - 1] - curve[half_window - 2]) / 4
+
+    dc = capacity(dc_curve)
+    ac = capacity(ac_curve)
+    lags = np.arange(-half_window, half_window)
+
+    params = {
+        'DC (ms)': round(dc, 2) if not np.isnan(dc) else 'N/A',
+        'AC (ms)': round(ac, 2) if not np.isnan(ac) else 'N/A'
+    }
+
+    return params, (lags, dc_curve, ac_curve)
+
+@timed()
+def calculate_hrt(rr_intervals, annotations, vpc_label='V', normal_label='N',
+                  prematurity=0.2, compensation=0.2):
+    """Kalp hızı türbülansı (HRT): türbülans başlangıcı (TO) ve eğimi (TS) hesapla.
+
+    annotations[k], rr_intervals[k] aralığını sonlandıran atımın etiketidir.
+    Uygun tüm VPC olaylarının taşikogramları (2 öncül, kuplaj, kompansatuvar
+    ve 15 sonraki RR) tek bir indeksleme ile 2B diziye toplanır. TS için 5 atımlık
+    regresyon eğimleri tüm olaylar üzerinde tek konvolüsyonla hesaplanır;
+    eğim doğrusal olduğundan olay ortalaması, ortalama taşikogramın eğimine eşittir.
+    """
+    rr_intervals = np.asarray(rr_intervals, dtype=float)
+    annotations = np.asarray(annotations)
+    n = len(rr_intervals)
+    empty = {'VPC Sayısı': 0, 'TO (%)': 'N/A', 'TS (ms/RR)': 'N/A'}, (np.array([]), np.array([]))
+    if len(annotations) != n:
+        return empty
+
+    offsets = np.arange(-2, 17)
+    candidates = np.flatnonzero(annotations == vpc_label)
+    candidates = candidates[(candidates >= 2) & (candidates + 16 < n)]
+    if len(candidates) == 0:
+        return empty
+
+    # Olaylar x 19 taşikogram ve etiket matrisleri
+    index = candidates[:, None] + offsets[None, :]
+    tachograms = rr_intervals[index]
+    labels = annotations[index]
+
+    reference = tachograms[:, :2].mean(axis=1)
+    sinus = np.delete(labels, 2, axis=1) == normal_label
+    sinus_rr = np.delete(tachograms, [2, 3], axis=1)
+    qualifying = (
+        sinus.all(axis=1)
+        & (tachograms[:, 2] <= reference * (1 - prematurity))
+        & (tachograms[:, 3] >= reference * (1 + compensation))
+        & ((sinus_rr >= 300) & (sinus_rr <= 2000)).all(axis=1)
+        & (np.abs(sinus_rr - reference[:, None]) <= reference[:, None] * 0.2).all(axis=1)
+    )
+    tachograms = tachograms[qualifying]
+    if len(tachograms) == 0:
+        return empty
+
+    # TO: [(RR1 + RR2) - (RR-2 + RR-1)] / (RR-2 + RR-1) x 100, olay başına
+    before = tachograms[:, 0] + tachograms[:, 1]
+    after = tachograms[:, 4] + tachograms[:, 5]
+    turbulence_onset = np.mean((after - before) / before * 100)
+
+    # TS: RR1..RR15 üzerinde 5 atımlık kayan doğrusal regresyon eğimleri
+    post = tachograms[:, 4:]
+    slope_kernel = np.array([[2, 1, 0, -1, -2]]) / 10.0
+    slopes = signal.convolve(post, slope_kernel, mode='valid')
+    turbulence_slope = np.max(slopes.mean(axis=0))
+
+    params = {
+        'VPC Sayısı': int(len(tachograms)),
+        'TO (%)': round(turbulence_onset, 2),
+        'TS (ms/RR)': round(turbulence_slope, 2)
+    }
+
+    return params, (offsets, tachograms.mean(axis=0))
+
+def _embed(x, m, n_templates):
+    """m boyutlu şablonları (gecikme vektörlerini) kopyasız görünüm olarak döndür."""
+    return sliding_window_view(x, m)[:n_templates]
+
+def _template_tree(templates, leafsize=8):
+    """Chebyshev aralık sayımı için KD-ağacı kur."""
+    return cKDTree(np.ascontiguousarray(templates), leafsize=leafsize)
+
+def _neighbor_counts(templates, r):
+    """Her şablonun r içindeki komşu sayısı (kendisi dahil).
+
+    Şablon başına sayım düğüm ziyaretine değil yaprak taramasına dayandığından
+    büyük yapraklar daha hızlıdır. Sorgular ağaç sırasında yapılır; ardışık
+    sorgular aynı düğümleri ziyaret eder.
+    """
+    tree = _template_tree(templates, leafsize=128)
+    counts = np.empty(len(templates), dtype=np.intp)
+    counts[tree.indices] = tree.query_ball_point(tree.data[tree.indices], r, p=np.inf,
+                                                 return_length=True, workers=-1)
+    return counts
+
+def calculate_sample_entropy(rr_intervals, m=2, r=None, r_ratio=0.2):
+    """Sample Entropy (SampEn) hesapla.
+
+    Eşleşen şablon çiftleri KD-ağacı üzerinde Chebyshev uzaklığıyla (d <= r)
+    sayılır; sonuç O(N²) tanımla birebir aynıdır.
+    """
+    x = np.asarray(rr_intervals, dtype=float)
+    if r is None:
+        r = r_ratio * np.std(x)
+    n_templates = len(x) - m
+    if n_templates < 2:
+        return np.nan
+
+    # count_neighbors sıralı çiftleri ve her şablonun kendisini de sayar
+    tree_m = _template_tree(_embed(x, m, n_templates))
+    tree_m1 = _template_tree(_embed(x, m + 1, n_templates))
+    b = (tree_m.count_neighbors(tree_m, r, p=np.inf) - n_templates) / 2
+    a = (tree_m1.count_neighbors(tree_m1, r, p=np.inf) - n_templates) / 2
+
+    if a == 0 or b == 0:
+        return np.nan
+    return -np.log(a / b)
+
+def calculate_approximate_entropy(rr_intervals, m=2, r=None, r_ratio=0.2):
+    """Approximate Entropy (ApEn) hesapla.
+
+    Her şablonun komşu sayısı (kendisi dahil) KD-ağacı aralık sorgusuyla bulunur;
+    sonuç O(N²) tanımla birebir aynıdır.
+    """
+    x = np.asarray(rr_intervals, dtype=float)
+    if r is None:
+        r = r_ratio * np.std(x)
+    if len(x) <= m + 1:
+        return np.nan
+
+    def phi(dim):
+        templates = _embed(x, dim, len(x) - dim + 1)
+        return np.mean(np.log(_neighbor_counts(templates, r) / len(templates)))
+
+    return phi(m) - phi(m + 1)
+
+@timed()
+def calculate_nonlinear_parameters(rr_intervals, m=2, r_ratio=0.2):
+    """Doğrusal olmayan (entropi) parametrelerini hesapla."""
+    rr_intervals = _as_rr_array(rr_intervals)
+    r = r_ratio * np.std(rr_intervals, dtype=np.float64)
+
+    sampen = calculate_sample_entropy(rr_intervals, m=m, r=r)
+    apen = calculate_approximate_entropy(rr_intervals, m=m, r=r)
+
+    return {
+        'SampEn': round(sampen, 3) if np.isfinite(sampen) else 'N/A',
+        'ApEn': round(apen, 3) if np.isfinite(apen) else 'N/A'
+    }
+
+@timed()
+def calculate_mse(rr_intervals, scale_max=20, m=2, r_ratio=0.2, max_workers=None):
+    """Multiscale Entropy (MSE) hesapla.
+
+    Tolerans r orijinal seriden bir kez hesaplanır ve tüm ölçeklerde kullanılır.
+    Kaba taneleme tek bir kümülatif toplam üzerinden yapılır; ölçekler birbirinden
+    bağımsız olduğu için iş parçacığı havuzunda paralel hesaplanır.
+    """
+    rr_intervals = _as_rr_array(rr_intervals)
+    r = r_ratio * np.std(rr_intervals, dtype=np.float64)
+    csum = np.concatenate(([0.0], np.cumsum(rr_intervals, dtype=np.float64)))
+    scales = np.arange(1, scale_max + 1)
+
+    def sampen_at_scale(scale):
+        # Ardışık `scale` örneğin ortalaması = kümülatif toplam farkı / scale
+        n = len(rr_intervals) // scale
+        coarse = (csum[scale:n * scale + 1:scale] - csum[0:n * scale:scale]) / scale
+        return calculate_sample_entropy(coarse, m=m, r=r)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        mse = np.array(list(executor.map(sampen_at_scale, scales)))
+
+    # Karmaşıklık indeksi: tanımlı ölçeklerdeki SampEn değerlerinin toplamı
+    finite = np.isfinite(mse)
+    complexity_index = np.sum(mse[finite]) if np.any(finite) else np.nan
+
+    params = {
+        'MSE Karmaşıklık İndeksi': round(complexity_index, 3) if not np.isnan(complexity_index) else 'N/A',
+        'MSE Tanımlı Ölçek Sayısı': int(np.sum(finite))
+    }
+
+    return params, (scales, mse)
+
+# analyze_record aşamaları: ad -> (bağlam, seçenekler) ile çağrılan hesaplama
+ANALYSIS_STAGES = {
+    'time': lambda ctx, opt: calculate_time_domain_parameters(ctx),
+    'frequency': lambda ctx, opt: calculate_frequency_domain_parameters(
+        ctx, config=opt['config'], raise_errors=opt.get('raise_errors', False)),
+    'dfa': lambda ctx, opt: calculate_dfa(ctx, scale_min=opt.get('scale_min', 4),
+                                          scale_max=opt.get('scale_max', 64)),
+    'time_frequency': lambda ctx, opt: calculate_time_frequency_parameters(
+        ctx, fs=opt['config'].fs, window_sec=opt.get('tf_window_sec', 120.0), step_sec=opt.get('tf_step_sec', 30.0),
+        lf_range=opt['config'].lf_range, hf_range=opt['config'].hf_range),
+    'nonlinear': lambda ctx, opt: calculate_nonlinear_parameters(ctx),
+    'mse': lambda ctx, opt: calculate_mse(ctx, scale_max=opt.get('mse_scale_max', 20)),
+    'poincare': lambda ctx, opt: calculate_poincare(ctx),
+    'prsa': lambda ctx, opt: calculate_prsa(ctx),
+    'hrt': lambda ctx, opt: calculate_hrt(opt['raw_rr'], opt['annotations']),
+}
+
+@timed()
+def analyze_record(rr_intervals, config=None, stages=None, resampler=None, start=None, end=None,
+                   max_workers=None, progress=None, **options):
+    """Bir kaydın analiz aşamalarını iş parçacığı havuzunda eşzamanlı çalıştır.
+
+    Aşamalar tek bir RecordContext'i paylaşır; ortak ara sonuçlar (dizi, farklar,
+    zamanlar, yeniden örneklenmiş seri) dağıtımdan önce bir kez hesaplanır.
+    NumPy/SciPy çekirdekleri GIL'i bıraktığından aşamalar gerçekten paralel ilerler.
+
+    stages: ANALYSIS_STAGES anahtarları (varsayılan: 'hrt' hariç tümü; annotations
+    ve raw_rr seçenekleri verilirse 'hrt' de eklenir). 'hrt' ham kayıt ve
+    etiketlerle çalışır; start/end verilirse bunlar da ham kaydın zaman ekseninde
+    aynı bölgeye kırpılır. progress(oran, aşama) her
+    aşama bittiğinde çağrılır. raise_errors=True seçeneği arayüz dışı çağıranlar
+    (ör. servis) içindir; aşama hataları st.error ile yutulmak yerine yükseltilir.
+    Döndürür: {aşama: aşama fonksiyonunun sonucu}.
+    """
+    config = HRVConfig() if config is None else config
+    options['config'] = config
+    if stages is None:
+        stages = [name for name in ANALYSIS_STAGES if name != 'hrt']
+        if options.get('annotations') is not None and options.get('raw_rr') is not None:
+            stages.append('hrt')
+    if not stages:
+        return {}
+
+    if ('hrt' in stages and (start is not None or end is not None)
+            and options.get('raw_rr') is not None and options.get('annotations') is not None):
+        raw_times = np.cumsum(options['raw_rr'], dtype=np.float64) / 1000.0
+        in_region = ((raw_times >= (-np.inf if start is None else start))
+                     & (raw_times <= (np.inf if end is None else end)))
+        options['raw_rr'] = np.asarray(options['raw_rr'])[in_region]
+        options['annotations'] = np.asarray(options['annotations'])[in_region]
+
+    context = rr_intervals if isinstance(rr_intervals, RecordContext) else RecordContext(
+        rr_intervals, fs=config.fs, resampler=resampler, start=start, end=end)
+
+    # Paylaşılan ara sonuçları iş parçacıklarına dağıtmadan önce hazırla
+    with span('ortak ara sonuçlar'):
+        context.diffs
+        if {'frequency', 'time_frequency'} & set(stages):
+            context.resampled
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages)) as executor:
+        # Her aşama çağıranın bağlamında (ör. etkin performans kaydı) çalışır
+        futures = {executor.submit(copy_context().run, ANALYSIS_STAGES[name], context, options): name
+                   for name in stages}
+        for done, future in enumerate(as_completed(futures), start=1):
+            name = futures[future]
+            results[name] = future.result()
+            if progress is not None:
+                progress(done / len(stages), name)
+
+    return results
@@ -0,0 +1,143 @@
+"""Aşama bazında süre ve bellek ölçümü (hafif span kaydı).
+
+Kayıt yalnızca recording() bağlamı (veya start()/stop()) etkinken yapılır;
+aksi halde span() paylaşılan boş bağlam yöneticisini, timed() ile sarılmış
+işlevler ise doğrudan özgün işlevi çağırır. Etkin kaydedici bir ContextVar'da
+tutulduğundan her Streamlit oturumu (betik iş parçacığı) kendi kaydını görür.
+Bağlamı kopyalanarak başlatılan iş parçacıklarının span'leri de aynı kayda
+eklenir; bu durumda tepe bellek değerleri (tracemalloc süreç geneli) yaklaşıktır.
+
+Kullanım:
+    with recording(trace_memory=True) as recorder:
+        with span('analiz'):
+            ...
+    recorder.to_json()
+"""
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+
+_active = ContextVar('hrv_recorder', default=None)
+_NULL_SPAN = nullcontext()
+
+
+class Recorder:
+    """Bir çalıştırmadaki span'leri başlangıç sırasıyla toplar."""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.spans = []
+        # Eşzamanlı aşamalar (ör. analyze_record) için her iş parçacığının kendi span yığını vardır
+        self._local = threading.local()
+        self._origin_ns = time.perf_counter_ns()
+        self._started_tracemalloc = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def close(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @property
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name):
+        stack = self._stack
+        record = {
+            'Aşama': name,
+            'İş Parçacığı': threading.current_thread().name,
+            'Derinlik': len(stack),
+            'Başlangıç (ms)': (time.perf_counter_ns() - self._origin_ns) / 1e6,
+            'Süre (ms)': None
+        }
+        self.spans.append(record)
+
+        # Bellek: tepe değer iç içe span'ler arasında üst span'e aktarılır
+        frame = {'start': 0, 'peak': 0}
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['start'] = frame['peak'] = current
+        stack.append(frame)
+
+        start_ns = time.perf_counter_ns()
+        try:
+            yield record
+        finally:
+            record['Süre (ms)'] = (time.perf_counter_ns() - start_ns) / 1e6
+            stack.pop()
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                frame['peak'] = max(frame['peak'], peak)
+                record['Tepe Bellek (KiB)'] = (frame['peak'] - frame['start']) / 1024
+                if stack:
+                    stack[-1]['peak'] = max(stack[-1]['peak'], frame['peak'])
+
+    def to_dict(self):
+        return {
+            'trace_memory': self.trace_memory,
+            'spans': [dict(record) for record in self.spans]
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+
+def start(trace_memory=False):
+    """Bu bağlamda kaydı başlat; stop() için (kaydedici, belirteç) döndürür."""
+    recorder = Recorder(trace_memory=trace_memory)
+    return recorder, _active.set(recorder)
+
+
+def stop(handle):
+    """start() ile başlatılan kaydı bitir ve kaydediciyi döndür."""
+    recorder, token = handle
+    _active.reset(token)
+    recorder.close()
+    return recorder
+
+
+@contextmanager
+def recording(trace_memory=False):
+    handle = start(trace_memory)
+    try:
+        yield handle[0]
+    finally:
+        stop(handle)
+
+
+def span(name):
+    """Etkin kaydedici varsa adlandırılmış span, yoksa boş bağlam yöneticisi."""
+    recorder = _active.get()
+    if recorder is None:
+        return _NULL_SPAN
+    return recorder.span(name)
+
+
+def timed(name=None):
+    """İşlev çağrısını span içinde çalıştıran dekoratör (kayıt kapalıyken ek yük tek bir kontrol)."""
+    def decorator(func):
+        label = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _active.get()
+            if recorder is None:
+                return func(*args, **kwargs)
+            with recorder.span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,89 @@
+"""Uzun analizleri Streamlit betik iş parçacığının dışında çalıştıran arka plan işleri.
+
+İşler süreç genelinde tek bir iş parçacığı havuzunda yürür ve kimlikleriyle
+kayıt defterinde tutulur; Streamlit yalnızca iş kimliğini session_state'te
+saklar. Betik yeniden çalıştığında (widget değişikliği vb.) iş kesilmez;
+aynı kimlikle bulunup ilerlemesi okunur ve bittiğinde sonucu alınır.
+"""
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Aynı anda çalışan analiz sayısı; fazlası kuyrukta bekler
+MAX_WORKERS = 2
+
+# Biten işler bu süre (s) sonra kayıt defterinden silinir
+JOB_TTL_SEC = 3600
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='hrv-job')
+_jobs = {}
+_lock = threading.Lock()
+_ids = itertools.count(1)
+
+
+class Job:
+    """Arka plan işinin ilerleme durumu ve sonucu."""
+
+    def __init__(self, job_id, key):
+        self.id = job_id
+        self.key = key
+        self.progress = 0.0
+        self.stage = 'Kuyrukta'
+        self.created = time.time()
+        self.finished = None
+        self.future = None
+
+    def update(self, progress, stage):
+        """İş fonksiyonu tarafından çağrılır: ilerleme (0-1) ve aşama adı."""
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        self.stage = stage
+
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def result(self):
+        """Sonucu döndür; iş hata ile bittiyse hatayı yeniden yükselt."""
+        return self.future.result()
+
+    def error(self):
+        return self.future.exception() if self.done else None
+
+
+def _run(job, func, args, kwargs):
+    job.update(0.0, 'Başladı')
+    try:
+        return func(job, *args, **kwargs)
+    finally:
+        job.finished = time.time()
+
+
+def _prune():
+    now = time.time()
+    for job_id in [job_id for job_id, job in _jobs.items()
+                   if job.finished is not None and now - job.finished > JOB_TTL_SEC]:
+        del _jobs[job_id]
+
+
+def submit(func, *args, key=None, **kwargs):
+    """func(job, *args, **kwargs) çağrısını arka planda başlat ve iş kimliğini döndür.
+
+    Aynı key ile çalışmakta olan bir iş varsa yenisi başlatılmaz, onun kimliği döner.
+    """
+    with _lock:
+        _prune()
+        if key is not None:
+            for job in _jobs.values():
+                if job.key == key and not job.done:
+                    return job.id
+        job = Job(f"job-{next(_ids)}", key)
+        _jobs[job.id] = job
+        job.future = _executor.submit(_run, job, func, args, kwargs)
+        return job.id
+
+
+def get(job_id):
+    """Kimliğe göre işi döndür (bilinmiyorsa veya süresi dolduysa None)."""
+    with _lock:
+        return _jobs.get(job_id)
@@ -0,0 +1,153 @@
+"""service.py için eşzamanlı istemci yük testi.
+
+Her istemci bir sentetik kaydı yükler, analizini ister ve raporunu alır. Kuyruk
+dolduğunda (503) Retry-After kadar bekleyip yeniden dener. Kayıtların bir kısmı
+istemciler arasında tekrarlanır; böylece içerik özeti önbelleğinin etkisi de görülür.
+Yalnızca standart kütüphane kullanılır.
+
+Kullanım:
+    python loadtest.py                          # servisi alt süreçte başlat, 50 istemci
+    python loadtest.py --url http://127.0.0.1:8000 --clients 50 --requests 4
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from synthetic_rr import generate_rr
+
+
+async def request(host, port, method, path, body=b'', content_type='application/json'):
+    """Tek HTTP/1.1 isteği gönder; (durum, başlıklar, gövde) döndür."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        head = (f"{method} {path} HTTP/1.1\r\nhost: {host}:{port}\r\ncontent-type: {content_type}\r\n"
+                f"content-length: {len(body)}\r\nconnection: close\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    header_block, _, payload = response.partition(b'\r\n\r\n')
+    lines = header_block.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ')[1])
+    headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(':') for line in lines[1:])}
+    return status, headers, payload
+
+
+async def call(stats, host, port, method, path, body=b'', content_type='application/json'):
+    """503 yanıtlarında Retry-After kadar bekleyip yeniden dene."""
+    while True:
+        start = time.perf_counter()
+        status, headers, payload = await request(host, port, method, path, body, content_type)
+        stats['latency'].append(time.perf_counter() - start)
+        if status != 503:
+            stats['status'][status] = stats['status'].get(status, 0) + 1
+            return status, payload
+        stats['rejected'] += 1
+        await asyncio.sleep(float(headers.get('retry-after', 1)))
+
+
+async def client(index, args, records, stats, host, port):
+    for step in range(args.requests):
+        rr_text = records[(index * args.requests + step) % len(records)]
+        status, payload = await call(stats, host, port, 'POST', '/records', rr_text, 'text/plain')
+        if status != 201:
+            continue
+        record_id = json.loads(payload)['record_id']
+
+        body = json.dumps({'config': {'welch_segment_sec': 120.0}, 'stages': args.stages}).encode()
+        status, payload = await call(stats, host, port, 'POST', f'/records/{record_id}/analyses', body)
+        if status != 200:
+            continue
+        analysis_id = json.loads(payload)['analysis_id']
+
+        if args.report:
+            await call(stats, host, port, 'GET', f'/analyses/{analysis_id}/report')
+        stats['completed'] += 1
+
+
+async def wait_for_service(host, port, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status, _, _ = await request(host, port, 'GET', '/health')
+            if status == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Servis başlatılamadı.")
+
+
+async def run(args, host, port):
+    records = []
+    for seed in range(args.distinct_records):
+        rr_intervals, _ = generate_rr(n_beats=args.beats, seed=seed)
+        records.append('\n'.join(f'{value:.0f}' for value in rr_intervals).encode())
+
+    await wait_for_service(host, port)
+    stats = {'latency': [], 'status': {}, 'rejected': 0, 'completed': 0}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i, args, records, stats, host, port) for i in range(args.clients)))
+    elapsed = time.perf_counter() - start
+
+    _, _, health = await request(host, port, 'GET', '/health')
+    latency = np.array(stats['latency']) * 1000
+    return {
+        'İstemci': args.clients,
+        'Tamamlanan Akış': stats['completed'],
+        'Süre (s)': round(elapsed, 2),
+        'Akış/s': round(stats['completed'] / elapsed, 2),
+        'İstek/s': round(len(latency) / elapsed, 2),
+        'Gecikme p50 (ms)': round(float(np.percentile(latency, 50)), 1),
+        'Gecikme p95 (ms)': round(float(np.percentile(latency, 95)), 1),
+        'Gecikme max (ms)': round(float(latency.max()), 1),
+        'Reddedilen (503)': stats['rejected'],
+        'Durum Kodları': stats['status'],
+        'Servis': json.loads(health)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default=None, help='Çalışan servis adresi (verilmezse alt süreçte başlatılır)')
+    parser.add_argument('--port', type=int, default=8765, help='Alt süreçte başlatılan servisin portu')
+    parser.add_argument('--workers', type=int, default=None, help='Alt süreçte başlatılan servisin işçi sayısı')
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2, help='İstemci başına yükleme + analiz akışı')
+    parser.add_argument('--distinct-records', type=int, default=20, help='Farklı kayıt sayısı (önbellek etkisi)')
+    parser.add_argument('--beats', type=int, default=2000)
+    parser.add_argument('--stages', nargs='+', default=['time', 'frequency', 'dfa', 'poincare', 'prsa'])
+    parser.add_argument('--report', action='store_true', help='Her analiz için HTML raporu da al')
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url is None:
+        command = [sys.executable, 'service.py', '--port', str(args.port)]
+        if args.workers:
+            command += ['--workers', str(args.workers)]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+        host, port = '127.0.0.1', args.port
+    else:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+
+    try:
+        summary = asyncio.run(run(args, host, port))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
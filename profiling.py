@@ -0,0 +1,141 @@
+"""Analiz çalıştırmalarını profilleyip kayıt özetine göre dosyaya döken hata ayıklama kancası.
+
+Her profil iki çıktı üretir:
+    profiles/<kayıt özeti>-<zaman>.prof       cProfile (pstats / snakeviz ile açılır)
+    profiles/<kayıt özeti>-<zaman>.collapsed  örneklemeli yığınlar, flamegraph.pl /
+                                              speedscope için "a;b;c sayı" biçiminde
+
+HRV_PROFILE=1 ortam değişkeni Streamlit'teki profil seçeneğini varsayılan olarak açar;
+HRV_PROFILE_DIR çıktı klasörünü değiştirir.
+"""
+import cProfile
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+
+PROFILE_DIR = os.environ.get('HRV_PROFILE_DIR', 'profiles')
+
+# Örnekleme aralığı (s); cProfile ile birlikte çalışırken yükü düşük tutar
+SAMPLING_INTERVAL = 0.005
+
+
+def profiling_enabled():
+    """HRV_PROFILE ortam değişkeni açık mı?"""
+    return os.environ.get('HRV_PROFILE', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def record_hash(rr_intervals):
+    """RR dizisinin içeriğinden kısa, kararlı bir özet üret (profil dosyası anahtarı)."""
+    data = np.ascontiguousarray(np.asarray(rr_intervals, dtype=np.float64))
+    return hashlib.sha1(data.tobytes()).hexdigest()[:12]
+
+
+def files_hash(files):
+    """Yüklenen dosya listesinin içeriğinden özet üret (toplu analiz profilleri için)."""
+    digest = hashlib.sha1()
+    for file in files:
+        digest.update(file.getvalue())
+    return digest.hexdigest()[:12]
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _StackSampler(threading.Thread):
+    """Hedef iş parçacığının ve profil sırasında açılan iş parçacıklarının yığınlarını örnekler.
+
+    Profil başlamadan önce var olan diğer iş parçacıkları (ör. Streamlit sunucusu)
+    atlanır; analyze_record'un aşama iş parçacıkları böylece çıktıya girer.
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._ignored = {thread.ident for thread in threading.enumerate()} - {thread_id}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        self._ignored.add(threading.get_ident())
+        while not self._stop_event.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident in self._ignored:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    """cProfile ve yığın örneklemesini birlikte yürüten profil oturumu.
+
+    cProfile yalnızca start() çağıran iş parçacığını görür; örnekleyici ayrıca
+    profil sırasında açılan iş parçacıklarını da kapsar. stop(key) çıktıları
+    PROFILE_DIR altına yazar ve (prof_yolu, collapsed_yolu) döndürür.
+    """
+
+    def __init__(self, interval=SAMPLING_INTERVAL, output_dir=None):
+        self.interval = interval
+        self.output_dir = output_dir or PROFILE_DIR
+        self._profile = None
+        self._sampler = None
+
+    def start(self):
+        self._profile = cProfile.Profile()
+        self._sampler = _StackSampler(threading.get_ident(), self.interval)
+        self._sampler.start()
+        self._profile.enable()
+        return self
+
+    def stop(self, key):
+        if self._profile is None:
+            return None
+        self._profile.disable()
+        self._sampler.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stem = os.path.join(self.output_dir, f"{key}-{time.strftime('%Y%m%d-%H%M%S')}")
+        prof_path = stem + '.prof'
+        collapsed_path = stem + '.collapsed'
+
+        self._profile.dump_stats(prof_path)
+        with open(collapsed_path, 'w') as f:
+            for stack, count in self._sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        self._profile = None
+        self._sampler = None
+        return prof_path, collapsed_path
+
+
+@contextmanager
+def profile_run(key, enabled=True):
+    """with bloğunu profille; enabled=False ise hiçbir şey yapmaz.
+
+    Yield edilen liste bloktan çıkışta (prof_yolu, collapsed_yolu) ile doldurulur.
+    """
+    paths = []
+    if not enabled:
+        yield paths
+        return
+    profiler = Profiler().start()
+    try:
+        yield paths
+    finally:
+        paths.extend(profiler.stop(key))
@@ -0,0 +1,669 @@
+"""Harici sistemler (ör. EHR entegrasyonu) için yerel HTTP/JSON analiz servisi.
+
+Saf bir ASGI uygulamasıdır ve ek bağımlılık gerektirmez. uvicorn requirements.txt'te
+yer almaz; varsayılan kurulumda aşağıdaki küçük standart kütüphane HTTP/1.1
+sunucusu çalışır. uvicorn ayrıca kurulmuşsa python service.py onu kullanır
+(--no-uvicorn ile yedek sunucu zorlanır):
+
+    python service.py --port 8000 --workers 4
+    uvicorn service:app --port 8000          # isteğe bağlı; HRV_SERVICE_WORKERS ile işçi sayısı
+
+Uç noktalar:
+    POST /records                      RR verisi yükle. Gövde metin (satır başına bir değer),
+                                       JSON ({"rr": [...]}) veya .npy olabilir;
+                                       ?time_unit=seconds saniyeyi ms'ye çevirir.
+    POST /records/{record_id}/analyses HRVConfig alanları ve seçeneklerle analiz çalıştır.
+                                       ?wait=false ise sonucu beklemeden 202 döner.
+    GET  /analyses/{analysis_id}       Sonucu getir (?include_data=true grafik verisini ekler)
+    GET  /analyses/{analysis_id}/report  HTML rapor
+    GET  /health                       İşçi ve kuyruk durumu
+
+Ayrıştırma, analiz ve rapor üretimi süreç havuzunda çalışır; olay döngüsü
+yalnızca istekleri yönlendirir. Kayıtlar içerik özetiyle, sonuçlar kayıt özeti +
+ayar + seçenek özetiyle önbelleğe alınır; aynı analiz için eşzamanlı istekler
+tek bir çalıştırmayı paylaşır. Kuyruktaki iş sayısı sınırı aşılırsa istek 503 ve
+Retry-After ile reddedilir (geri basınç).
+"""
+import argparse
+import asyncio
+import dataclasses
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs
+
+import numpy as np
+from scipy import signal
+
+from hrv_analysis import (HRVConfig, ANALYSIS_STAGES, PRECISION_DTYPES, RRSeries, RecordContext, correct_artifacts,
+                          validate_rr_data, analyze_record)
+from profiling import record_hash
+from utils import (load_rr_intervals, create_psd_plot, create_dfa_plot, create_mse_plot, create_poincare_plot,
+                   figure_to_html, generate_report)
+
+# İşçi süreç sayısı (varsayılan: CPU sayısı)
+DEFAULT_WORKERS = int(os.environ.get('HRV_SERVICE_WORKERS', 0)) or os.cpu_count() or 1
+
+# Aynı anda kabul edilen (çalışan + kuyrukta bekleyen) iş sayısı, işçi başına
+QUEUE_PER_WORKER = 4
+
+# Önbellek sınırları (en eski kullanılan atılır)
+MAX_RECORDS = 256
+MAX_RESULTS = 256
+
+# Yükleme gövdesi sınırı (bayt)
+MAX_BODY_BYTES = 64 << 20
+
+# Kuyruk dolduğunda istemciye önerilen bekleme süresi (s)
+RETRY_AFTER_SEC = 1
+
+# Servisin çalıştırdığı aşamalar; 'hrt' vuru etiketleri gerektirdiğinden dahil değildir
+SERVICE_STAGES = tuple(name for name in ANALYSIS_STAGES if name != 'hrt')
+
+# Sayısal HRVConfig alanları ve analyze_record seçenekleri: (tür, alt sınır, üst sınır).
+# Üst sınırlar tek bir isteğin bellek ve süre kullanımını da sınırlar.
+CONFIG_LIMITS = {
+    'fs': (float, 1.0, 32.0),
+    'welch_segment_sec': (float, 10.0, 3600.0),
+    'welch_overlap': (float, 0.0, 0.9),
+    'welch_nfft': (int, 64, 1 << 18),
+}
+ANALYSIS_OPTIONS = {
+    'scale_min': (int, 4, 256),
+    'scale_max': (int, 8, 1024),
+    'tf_window_sec': (float, 10.0, 3600.0),
+    'tf_step_sec': (float, 1.0, 3600.0),
+    'mse_scale_max': (int, 1, 40),
+}
+BAND_FIELDS = ('vlf_range', 'lf_range', 'hf_range')
+
+ARTIFACT_METHODS = (None, 'interpolate', 'remove')
+
+
+class ServiceError(Exception):
+    """İstemciye HTTP durum koduyla döndürülen hata."""
+
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = list(headers)
+
+
+class _UploadedFile(io.BytesIO):
+    """load_rr_intervals için Streamlit file_uploader arayüzü (getvalue()/name)."""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+# --- İşçi süreç fonksiyonları ---
+
+def _parse_record(body, content_type, time_unit):
+    """Yüklenen gövdeden float64 RR dizisi (ms) üret."""
+    if content_type.startswith('application/json'):
+        payload = json.loads(body)
+        values = np.asarray(payload['rr'] if isinstance(payload, dict) else payload, dtype=np.float64).ravel()
+        rr_intervals = values[values > 0]
+    else:
+        name = 'rr.npy' if content_type in ('application/x-npy', 'application/octet-stream') else 'rr.txt'
+        rr_intervals = load_rr_intervals(_UploadedFile(body, name))
+        if rr_intervals is None:
+            return None
+        rr_intervals = np.asarray(rr_intervals, dtype=np.float64)
+    if time_unit == 'seconds':
+        rr_intervals = rr_intervals * 1000
+    return rr_intervals if len(rr_intervals) else None
+
+
+def _run_analysis(rr_intervals, config, stages, artifact_method, options):
+    """Kaydı düzelt, doğrula ve aşamaları çalıştır; (parametreler, aşama sonuçları) döndür."""
+    # Kalite raporu düzeltilmemiş kayıttan alınır
+    quality = validate_rr_data(rr_intervals)
+    artifact_pct = 0.0
+    if artifact_method is not None:
+        rr_intervals, artifact_report = correct_artifacts(rr_intervals, method=artifact_method)
+        artifact_pct = artifact_report['Düzeltilen Atım (%)']
+
+    # Seçilen hassasiyet modunda sakla
+    rr_intervals = RRSeries(rr_intervals, config.precision).values
+
+    # Analiz, düzeltilmiş kaydın geçerliliğine göre yapılır
+    usable = validate_rr_data(rr_intervals) if artifact_method is not None else quality
+    if not usable.is_valid:
+        raise ValueError(usable.message)
+
+    context = RecordContext(rr_intervals, fs=config.fs)
+    # Süreç havuzu zaten çekirdekleri doldurur; aşamalar işçide sırayla çalışır.
+    # Aşama hataları yutulmaz; başarısız aşama adıyla birlikte 422 olarak bildirilir.
+    stage_results = {}
+    for stage in stages:
+        try:
+            stage_results.update(analyze_record(context, config=config, stages=[stage], max_workers=1,
+                                                raise_errors=True, **options))
+        except Exception as e:
+            raise ValueError(f"'{stage}' aşaması hesaplanamadı: {e}") from e
+
+    parameters = {
+        'Kayıt Süresi (dk)': round(float(context.times[-1]) / 60, 2),
+        'Düzeltilen Atım (%)': artifact_pct,
+        'Geçerli Veri (%)': quality.valid_percent
+    }
+    for result in stage_results.values():
+        parameters.update(result[0] if isinstance(result, tuple) else result)
+    return parameters, stage_results
+
+
+def _render_report(parameters, stage_results, config):
+    """Önbellekteki aşama sonuçlarından Streamlit raporuyla aynı HTML'i üret."""
+    def params(stage):
+        result = stage_results.get(stage)
+        return {} if result is None else (result[0] if isinstance(result, tuple) else result)
+
+    def plot_html(stage, build):
+        result = stage_results.get(stage)
+        return None if result is None else figure_to_html(build(*result))
+
+    nonlinear_params = {}
+    for stage in ('nonlinear', 'mse', 'poincare', 'prsa'):
+        nonlinear_params.update(params(stage))
+
+    return generate_report(
+        params('time'),
+        params('frequency'),
+        params('dfa'),
+        parameters['Kayıt Süresi (dk)'],
+        psd_html=plot_html('frequency', lambda _, data: create_psd_plot(
+            data[0], data[1], vlf_range=config.vlf_range, lf_range=config.lf_range, hf_range=config.hf_range)),
+        dfa_html=plot_html('dfa', lambda _, data: create_dfa_plot(data[0], data[1])),
+        nonlinear_params=nonlinear_params or None,
+        mse_html=plot_html('mse', lambda _, data: create_mse_plot(data[0], data[1])),
+        poincare_html=plot_html('poincare', lambda p, data: create_poincare_plot(
+            data[0], data[1], p['SD1 (ms)'], p['SD2 (ms)']))
+    )
+
+
+# --- JSON dönüşümü ---
+
+def _jsonable(value):
+    """numpy türlerini ve NaN/inf değerlerini JSON'a uygun hale getir."""
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return _jsonable(value.tolist())
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def _stage_data(stage_results):
+    """Aşamaların grafik verilerini (parametreler hariç) JSON'a dönüştür."""
+    return {stage: _jsonable(result[1]) for stage, result in stage_results.items() if isinstance(result, tuple)}
+
+
+def _parse_number(name, value, kind, low, high):
+    """Sayısal alanın türünü ve aralığını doğrula."""
+    is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+    if not is_number or (kind is int and not float(value).is_integer()):
+        raise ServiceError(400, f"'{name}' {'tam sayı' if kind is int else 'sayı'} olmalıdır.")
+    # NaN karşılaştırmaları yanlış döndüğünden aralık dışı sayılır
+    if not low <= value <= high:
+        raise ServiceError(400, f"'{name}' {low} ile {high} arasında olmalıdır.")
+    return kind(value)
+
+
+def _parse_band(name, value):
+    """[alt, üst] frekans bandını demete dönüştür."""
+    if not (isinstance(value, list) and len(value) == 2
+            and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value)):
+        raise ServiceError(400, f"'{name}' iki sayıdan oluşan [alt, üst] listesi olmalıdır.")
+    return tuple(float(v) for v in value)
+
+
+def _parse_config(payload):
+    """İstek gövdesindeki 'config' alanından HRVConfig oluştur; alan türlerini ve aralıklarını doğrula."""
+    if not isinstance(payload, dict):
+        raise ServiceError(400, "'config' bir JSON nesnesi olmalıdır.")
+    unknown = set(payload) - {field.name for field in dataclasses.fields(HRVConfig)}
+    if unknown:
+        raise ServiceError(400, f"Bilinmeyen ayar alanları: {', '.join(sorted(unknown))}")
+
+    values = {}
+    for name, value in payload.items():
+        if name in CONFIG_LIMITS:
+            values[name] = _parse_number(name, value, *CONFIG_LIMITS[name])
+        elif name in BAND_FIELDS:
+            values[name] = _parse_band(name, value)
+        elif name == 'precision':
+            if not isinstance(value, str) or value not in PRECISION_DTYPES:
+                raise ServiceError(400, f"'precision' şunlardan biri olmalıdır: {', '.join(PRECISION_DTYPES)}")
+            values[name] = value
+        elif name == 'welch_window':
+            # Ayar önbellek anahtarı olarak kullanıldığından yalnızca parametresiz pencere adları kabul edilir
+            try:
+                if not isinstance(value, str):
+                    raise TypeError("pencere adı bir metin olmalıdır")
+                signal.get_window(value, 64)
+            except (TypeError, ValueError) as e:
+                raise ServiceError(400, f"Geçersiz 'welch_window': {e}")
+            values[name] = value
+    config = HRVConfig(**values)
+
+    # Varsayılan bantlar da seçilen fs'nin Nyquist sınırına göre denetlenir
+    nyquist = config.fs / 2
+    for name in BAND_FIELDS:
+        low, high = getattr(config, name)
+        if not 0 <= low < high <= nyquist:
+            raise ServiceError(400, f"'{name}' için 0 <= alt < üst <= {nyquist:g} Hz olmalıdır.")
+    return config
+
+
+def _parse_options(payload):
+    """analyze_record'a aktarılan sayısal seçenekleri doğrula."""
+    options = {name: _parse_number(name, payload[name], *limits)
+               for name, limits in ANALYSIS_OPTIONS.items() if name in payload}
+    if options.get('scale_min', 4) >= options.get('scale_max', 64):
+        raise ServiceError(400, "'scale_min', 'scale_max' değerinden küçük olmalıdır.")
+    if options.get('tf_step_sec', 30.0) > options.get('tf_window_sec', 120.0):
+        raise ServiceError(400, "'tf_step_sec', 'tf_window_sec' değerinden büyük olamaz.")
+    return options
+
+
+def _analysis_key(record_id, config, stages, artifact_method, options):
+    """Kayıt özeti, ayarlar ve seçeneklerden kararlı analiz anahtarı üret."""
+    spec = json.dumps([record_id, dataclasses.asdict(config), sorted(stages), artifact_method, options],
+                      sort_keys=True, default=list)
+    return hashlib.sha1(spec.encode('utf-8')).hexdigest()[:16]
+
+
+class _LRU(OrderedDict):
+    """Boyutu sınırlı, en eski kullanılanı atan sözlük."""
+
+    def __init__(self, max_size):
+        super().__init__()
+        self.max_size = max_size
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def put(self, key, value):
+        self[key] = value
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
+
+
+class AnalysisService:
+    """hrv_analysis'i HTTP/JSON üzerinden sunan ASGI uygulaması."""
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or DEFAULT_WORKERS
+        self.max_pending = max_pending or self.workers * QUEUE_PER_WORKER
+        self.records = _LRU(MAX_RECORDS)
+        self.results = _LRU(MAX_RESULTS)
+        self.pending = 0
+        self._in_flight = {}
+        self._executor = None
+        self._routes = [
+            ('POST', re.compile(r'^/records$'), self.upload_record),
+            ('POST', re.compile(r'^/records/(?P<record_id>[0-9a-f]+)/analyses$'), self.create_analysis),
+            ('GET', re.compile(r'^/analyses/(?P<analysis_id>[0-9a-f]+)$'), self.get_analysis),
+            ('GET', re.compile(r'^/analyses/(?P<analysis_id>[0-9a-f]+)/report$'), self.get_report),
+            ('GET', re.compile(r'^/health$'), self.health),
+        ]
+
+    # --- Süreç havuzu ve geri basınç ---
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            # 'spawn': fork ile oluşan işçi açık istemci soketlerini devralır ve
+            # kapatılan bağlantılar istemci tarafında EOF görmeden açık kalır
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def start(self):
+        """Tüm işçileri istek kabul edilmeden önce başlat (ilk istekler içe aktarma süresini beklemez)."""
+        for future in [self.executor.submit(int) for _ in range(self.workers)]:
+            future.result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _reserve(self):
+        """Kuyrukta yer ayır; doluysa 503 ile reddet (geri basınç)."""
+        if self.pending >= self.max_pending:
+            raise ServiceError(503, "Analiz kuyruğu dolu, lütfen daha sonra tekrar deneyin.",
+                               headers=[(b'retry-after', str(RETRY_AFTER_SEC).encode())])
+        self.pending += 1
+
+    async def _execute(self, func, *args):
+        """_reserve() ile yer ayrılmış func'ı süreç havuzunda çalıştır ve yeri bırak."""
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def _offload(self, func, *args):
+        self._reserve()
+        return await self._execute(func, *args)
+
+    # --- Uç noktalar ---
+
+    async def upload_record(self, request):
+        time_unit = request['query'].get('time_unit', 'milliseconds')
+        if time_unit not in ('milliseconds', 'seconds'):
+            raise ServiceError(400, "time_unit 'milliseconds' veya 'seconds' olmalıdır.")
+        try:
+            rr_intervals = await self._offload(_parse_record, request['body'], request['content_type'], time_unit)
+        except (ValueError, KeyError, TypeError) as e:
+            raise ServiceError(400, f"Dosya okuma hatası: {e}")
+        if rr_intervals is None:
+            raise ServiceError(422, "Dosyada geçerli RR aralığı verisi bulunamadı.")
+
+        record_id = record_hash(rr_intervals)
+        self.records.put(record_id, rr_intervals)
+        return 201, {'record_id': record_id, 'beats': len(rr_intervals)}
+
+    async def create_analysis(self, request, record_id):
+        rr_intervals = self.records.get(record_id)
+        if rr_intervals is None:
+            raise ServiceError(404, "Kayıt bulunamadı; önce /records ile yükleyin.")
+
+        payload = request['json'] or {}
+        if not isinstance(payload, dict):
+            raise ServiceError(400, "İstek gövdesi bir JSON nesnesi olmalıdır.")
+        config = _parse_config(payload.get('config', {}))
+        stages = payload.get('stages') or list(SERVICE_STAGES)
+        if not isinstance(stages, list) or not all(isinstance(stage, str) for stage in stages):
+            raise ServiceError(400, "'stages' aşama adlarından oluşan bir liste olmalıdır.")
+        unknown = set(stages) - set(SERVICE_STAGES)
+        if unknown:
+            raise ServiceError(400, f"Bilinmeyen aşamalar: {', '.join(sorted(unknown))}")
+        artifact_method = payload.get('artifact_method', 'interpolate')
+        if artifact_method not in ARTIFACT_METHODS:
+            raise ServiceError(400, f"Geçersiz artefakt yöntemi: {artifact_method}")
+        options = _parse_options(payload)
+
+        analysis_id = _analysis_key(record_id, config, stages, artifact_method, options)
+        if analysis_id not in self.results and analysis_id not in self._in_flight:
+            # Yer eşzamanlı olarak ayrılır; böylece aynı anda gelen istekler sınırı aşamaz
+            self._reserve()
+            task = asyncio.ensure_future(
+                self._analyze(analysis_id, record_id, rr_intervals, config, stages, artifact_method, options))
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._in_flight[analysis_id] = task
+
+        if request['query'].get('wait') == 'false':
+            status = 'running' if analysis_id in self._in_flight else 'done'
+            return 202, {'analysis_id': analysis_id, 'status': status}
+        return 200, await self._result(analysis_id, request['query'].get('include_data') == 'true')
+
+    async def _analyze(self, analysis_id, record_id, rr_intervals, config, stages, artifact_method, options):
+        try:
+            try:
+                parameters, stage_results = await self._execute(
+                    _run_analysis, rr_intervals, config, stages, artifact_method, options)
+            except ValueError as e:
+                # Geçersiz kayıt sonucu da önbelleğe alınır; tekrar hesaplanmaz
+                self.results.put(analysis_id, {'error': ServiceError(422, str(e))})
+                raise self.results[analysis_id]['error']
+            self.results.put(analysis_id, {
+                'record_id': record_id, 'config': config, 'parameters': parameters,
+                'stage_results': stage_results, 'report': None
+            })
+        finally:
+            self._in_flight.pop(analysis_id, None)
+
+    async def _entry(self, analysis_id):
+        """Sonuç kaydını döndür; analiz sürüyorsa bitmesini bekle."""
+        entry = self.results.get(analysis_id)
+        if entry is None:
+            task = self._in_flight.get(analysis_id)
+            if task is None:
+                raise ServiceError(404, "Analiz bulunamadı.")
+            await asyncio.shield(task)
+            entry = self.results.get(analysis_id)
+        if 'error' in entry:
+            raise entry['error']
+        return entry
+
+    async def _result(self, analysis_id, include_data=False):
+        entry = await self._entry(analysis_id)
+        body = {
+            'analysis_id': analysis_id,
+            'record_id': entry['record_id'],
+            'config': dataclasses.asdict(entry['config']),
+            'parameters': _jsonable(entry['parameters'])
+        }
+        if include_data:
+            body['data'] = _stage_data(entry['stage_results'])
+        return body
+
+    async def get_analysis(self, request, analysis_id):
+        if analysis_id in self._in_flight and request['query'].get('wait') == 'false':
+            return 202, {'analysis_id': analysis_id, 'status': 'running'}
+        return 200, await self._result(analysis_id, request['query'].get('include_data') == 'true')
+
+    async def get_report(self, request, analysis_id):
+        entry = await self._entry(analysis_id)
+        if entry['report'] is None:
+            entry['report'] = await self._offload(
+                _render_report, entry['parameters'], entry['stage_results'], entry['config'])
+        return 200, entry['report']
+
+    async def health(self, request):
+        return 200, {
+            'workers': self.workers,
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'records': len(self.records),
+            'results': len(self.results)
+        }
+
+    # --- ASGI ---
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        try:
+            handler, params = self._route(scope['method'], scope['path'])
+            request = await self._read_request(scope, receive)
+            status, body = await handler(request, **params)
+        except ServiceError as e:
+            await _send_response(send, e.status, {'error': e.message}, e.headers)
+            return
+        except Exception as e:
+            await _send_response(send, 500, {'error': f"Analiz hatası: {e}"})
+            return
+        await _send_response(send, status, body)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await asyncio.get_running_loop().run_in_executor(None, self.start)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _route(self, method, path):
+        allowed = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match:
+                if route_method == method:
+                    return handler, match.groupdict()
+                allowed = True
+        if allowed:
+            raise ServiceError(405, "Bu yöntem desteklenmiyor.")
+        raise ServiceError(404, "Uç nokta bulunamadı.")
+
+    async def _read_request(self, scope, receive):
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise ServiceError(413, "İstek gövdesi çok büyük.")
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                break
+        body = b''.join(chunks)
+
+        headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope['headers']}
+        content_type = headers.get('content-type', 'text/plain').split(';')[0].strip().lower()
+        query = {key: values[-1] for key, values in parse_qs(scope.get('query_string', b'').decode()).items()}
+
+        parsed = None
+        if content_type == 'application/json' and body and scope['path'] != '/records':
+            try:
+                parsed = json.loads(body)
+            except ValueError:
+                raise ServiceError(400, "Geçersiz JSON gövdesi.")
+        return {'body': body, 'content_type': content_type, 'query': query, 'json': parsed}
+
+
+async def _send_response(send, status, body, headers=()):
+    if isinstance(body, str):
+        payload, content_type = body.encode('utf-8'), b'text/html; charset=utf-8'
+    else:
+        payload, content_type = json.dumps(body, ensure_ascii=False).encode('utf-8'), b'application/json'
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type), (b'content-length', str(len(payload)).encode()), *headers]
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+app = AnalysisService()
+
+
+# --- uvicorn yoksa kullanılan yedek sunucu ---
+
+_REASONS = {200: 'OK', 201: 'Created', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found',
+            405: 'Method Not Allowed', 411: 'Length Required', 413: 'Payload Too Large',
+            422: 'Unprocessable Entity', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+async def _handle_connection(asgi_app, reader, writer):
+    """Tek bir HTTP/1.1 isteğini ASGI uygulamasına aktar (bağlantı başına bir istek)."""
+    try:
+        request_line = (await reader.readline()).decode('latin-1').rstrip('\r\n')
+        if not request_line:
+            return
+        method, target, _ = request_line.split(' ', 2)
+        headers = []
+        while True:
+            line = (await reader.readline()).decode('latin-1').rstrip('\r\n')
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers.append((name.strip().lower().encode('latin-1'), value.strip().encode('latin-1')))
+        header_map = dict(headers)
+
+        response = {}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['head'] = message
+            elif message['type'] == 'http.response.body':
+                head = response['head']
+                lines = [f"HTTP/1.1 {head['status']} {_REASONS.get(head['status'], '')}"]
+                lines += [f"{key.decode('latin-1')}: {value.decode('latin-1')}" for key, value in head['headers']]
+                lines.append('connection: close')
+                writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + message.get('body', b''))
+                await writer.drain()
+
+        if b'transfer-encoding' in header_map:
+            await _send_response(send, 411, {'error': "Content-Length gereklidir."})
+            return
+        length = int(header_map.get(b'content-length', b'0'))
+        if length > MAX_BODY_BYTES:
+            await _send_response(send, 413, {'error': "İstek gövdesi çok büyük."})
+            return
+        body = await reader.readexactly(length) if length else b''
+
+        async def receive():
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        path, _, query = target.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method.upper(),
+            'path': path, 'raw_path': path.encode('latin-1'), 'query_string': query.encode('latin-1'),
+            'headers': headers, 'scheme': 'http', 'server': writer.get_extra_info('sockname'),
+            'client': writer.get_extra_info('peername')
+        }
+        await asgi_app(scope, receive, send)
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(asgi_app, host='127.0.0.1', port=8000):
+    """Standart kütüphane ile ASGI uygulamasını sun (yalnızca yerel kullanım için)."""
+    asgi_app.start()
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(asgi_app, reader, writer), host, port, backlog=1024)
+    print(f"HRV analiz servisi: http://{host}:{port}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        asgi_app.close()
+
+
+def main(argv=None):
+    global app
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None, help='İşçi süreç sayısı')
+    parser.add_argument('--max-pending', type=int, default=None, help='Kuyruk sınırı (çalışan + bekleyen)')
+    parser.add_argument('--no-uvicorn', action='store_true', help='uvicorn kurulu olsa da yedek sunucuyu kullan')
+    args = parser.parse_args(argv)
+
+    app = AnalysisService(workers=args.workers, max_pending=args.max_pending)
+    try:
+        import uvicorn
+    except ImportError:
+        uvicorn = None
+
+    if uvicorn is not None and not args.no_uvicorn:
+        uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+    else:
+        try:
+            asyncio.run(serve(app, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
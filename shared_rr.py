@@ -0,0 +1,102 @@
+"""Çoklu dosya analizinde RR dizilerini işçi süreçlere kopyasız aktarma.
+
+Yüklenen tüm RR dizileri tek bir multiprocessing.shared_memory bloğuna ardışık
+yerleştirilir; işçilere yalnızca (blok adı, ofset, uzunluk, dtype) tanımlayıcısı
+gönderilir ve işçi bu bloğun üzerinde kopyasız bir ndarray görünümü kurar.
+Bloğun sahibi ana süreçtir: işçi çökse bile blok, SharedRRStore kapatılırken
+(with bloğundan çıkışta) serbest bırakılır.
+"""
+from collections import namedtuple
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# İşçiye gönderilen tek bilgi; pickle boyutu dizi uzunluğundan bağımsızdır
+RRDescriptor = namedtuple('RRDescriptor', ['name', 'offset', 'length', 'dtype'])
+
+# Her dizi 64 baytlık sınıra hizalanır (önbellek satırı; tüm dtype'lar için geçerli hizalama)
+_ALIGNMENT = 64
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+class SharedRRStore:
+    """RR dizilerini tek paylaşımlı bellek bloğunda tutan bağlam yöneticisi.
+
+    Kullanım:
+        with SharedRRStore(arrays) as store:
+            futures = [pool.submit(work, d) for d in store.descriptors]
+    """
+
+    def __init__(self, arrays):
+        arrays = [np.ascontiguousarray(rr_intervals) for rr_intervals in arrays]
+
+        offsets = []
+        size = 0
+        for rr_intervals in arrays:
+            offset = _aligned(size)
+            offsets.append(offset)
+            size = offset + rr_intervals.nbytes
+
+        # Boyutu 0 olan blok oluşturulamaz
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            self.descriptors = []
+            for rr_intervals, offset in zip(arrays, offsets):
+                view = np.ndarray(rr_intervals.shape, dtype=rr_intervals.dtype,
+                                  buffer=self._shm.buf, offset=offset)
+                view[:] = rr_intervals
+                del view
+                self.descriptors.append(
+                    RRDescriptor(self._shm.name, offset, len(rr_intervals), rr_intervals.dtype.str))
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def nbytes(self):
+        return self._shm.size
+
+    def close(self):
+        """Bloğu kapat ve sistemden sil (birden fazla çağrılabilir)."""
+        if self._shm is None:
+            return
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@contextmanager
+def attach_rr(descriptor):
+    """Tanımlayıcının gösterdiği RR dizisine kopyasız, salt okunur görünüm ver.
+
+    Görünüm yalnızca with bloğu içinde geçerlidir; bloktan çıkarken
+    (görünüme başka referans kalmadıysa) paylaşımlı bellek tutamacı kapatılır.
+    Blok silinmez; silme işi sahibi olan SharedRRStore'a aittir.
+    """
+    shm = shared_memory.SharedMemory(name=descriptor.name)
+    view = None
+    try:
+        view = np.ndarray((descriptor.length,), dtype=np.dtype(descriptor.dtype),
+                          buffer=shm.buf, offset=descriptor.offset)
+        view.flags.writeable = False
+        yield view
+    finally:
+        del view
+        try:
+            shm.close()
+        except BufferError:
+            # Çağıran görünümden türetilmiş bir referans tuttu; tutamaç süreç bitince kapanır
+            pass
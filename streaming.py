@@ -0,0 +1,492 @@
+"""Canlı RR akışından gerçek zamanlı HRV (göğüs bandı köprüsünün yerel karşılığı).
+
+RR aralıkları tek tek soket, stdin veya büyüyen bir dosyadan (tail) gelir ve
+sabit kapasiteli bir halka tampona yazılır. RMSSD, SDNN, ortalama KH ve pNN50
+tamponun birikimli toplamlarından her atımda O(1) güncellenir; tampondan
+çıkan en eski atımın katkısı toplamlardan düşülür. VLF/LF/HF güçleri Welch
+yeniden hesaplanmadan BandPowerTracker süzgeç bankasıyla örnek başına
+güncellenir. DFA parametreleri akış zamanında her refresh_sec saniyede bir
+tampon anlık görüntüsünden tek işçili bir süreç havuzunda yeniden hesaplanır;
+böylece atım başına güncelleme gecikmesi (hedef < 1 ms) bu hesaptan etkilenmez.
+
+Kullanım:
+    python streaming.py --source stdin < kayit.txt
+    python streaming.py --source socket --port 9000     # nc 127.0.0.1 9000 < kayit.txt
+    python streaming.py --source tail kayit.txt --time-unit seconds
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import signal
+
+from hrv_analysis import HRVConfig, calculate_dfa
+
+# Varsayılan tampon kapasitesi (atım, ~5 dk) ve DFA yenileme aralığı (s, akış zamanı)
+DEFAULT_CAPACITY = 400
+DEFAULT_REFRESH_SEC = 30.0
+
+# DFA hesabı için tamponda bulunması gereken en az atım
+MIN_REFRESH_BEATS = 100
+
+# Grafik için saklanan atım başına ölçüm ve gecikme örneği sayısı
+HISTORY_SIZE = 2000
+
+
+class RRRingBuffer:
+    """Son capacity RR aralığını ve zaman alanı parametrelerinin birikimli toplamlarını tutar.
+
+    Toplamlar float64'tür; çıkarma ile biriken yuvarlama hatası tampon her
+    tamamen yenilendiğinde (capacity çıkarmada bir) sıfırdan toplanarak giderilir.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity < 2:
+            raise ValueError("Tampon kapasitesi en az 2 olmalıdır.")
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=np.float64)
+        self._start = 0
+        self._count = 0
+        self._evictions = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._diff_sq = 0.0
+        self._nn50 = 0
+
+    def __len__(self):
+        return self._count
+
+    def push(self, rr):
+        """Yeni RR aralığını (ms) ekle; tampon doluysa en eskisini çıkar."""
+        rr = float(rr)
+        capacity = self.capacity
+        if self._count == capacity:
+            oldest = float(self._data[self._start])
+            diff = float(self._data[(self._start + 1) % capacity]) - oldest
+            self._sum -= oldest
+            self._sum_sq -= oldest * oldest
+            self._diff_sq -= diff * diff
+            self._nn50 -= int(abs(diff) > 50)
+            self._start = (self._start + 1) % capacity
+            self._count -= 1
+            self._evictions += 1
+
+        if self._count:
+            diff = rr - float(self._data[(self._start + self._count - 1) % capacity])
+            self._diff_sq += diff * diff
+            self._nn50 += int(abs(diff) > 50)
+        self._data[(self._start + self._count) % capacity] = rr
+        self._count += 1
+        self._sum += rr
+        self._sum_sq += rr * rr
+
+        if self._evictions >= capacity:
+            self._resum()
+
+    def _resum(self):
+        values = self.values()
+        diffs = np.diff(values)
+        self._sum = float(np.sum(values))
+        self._sum_sq = float(np.dot(values, values))
+        self._diff_sq = float(np.dot(diffs, diffs))
+        self._nn50 = int(np.count_nonzero(np.abs(diffs) > 50))
+        self._evictions = 0
+
+    def values(self):
+        """Tampondaki RR aralıkları, eskiden yeniye sıralı kopya."""
+        end = self._start + self._count
+        if end <= self.capacity:
+            return self._data[self._start:end].copy()
+        return np.concatenate((self._data[self._start:], self._data[:end - self.capacity]))
+
+    def metrics(self):
+        """Tampon üzerinde calculate_time_domain_parameters ile aynı tanımlı ölçümler."""
+        n = self._count
+        if n < 2:
+            return {}
+        mean_rr = self._sum / n
+        variance = max(self._sum_sq / n - mean_rr * mean_rr, 0.0)
+        return {
+            'Ortalama KH (atım/dk)': round(60000 / mean_rr, 2),
+            'SDNN (ms)': round(variance ** 0.5, 2),
+            'RMSSD (ms)': round((max(self._diff_sq, 0.0) / (n - 1)) ** 0.5, 2),
+            'pNN50 (%)': round(self._nn50 / n * 100, 2)
+        }
+
+
+class BandPowerTracker:
+    """VLF/LF/HF bant güçlerini akış üzerinde örnek başına güncelleyen süzgeç bankası.
+
+    Atımlar fs Hz'lik düzenli ızgaraya kübik Hermite (Catmull-Rom) interpolasyonla
+    yerleştirilir; eğim için bir sonraki atım gerektiğinden ızgara bir atım geriden
+    gelir. Her örnek her bandın Butterworth bant geçiren süzgecinden (ikinci
+    dereceden bölümler, DF-II transpoze) geçirilir ve çıkışın karesi üstel ortalamayla
+    biriktirilir. Bant dışı bileşenler süzüldüğünden bu ortalama Welch PSD'sinin bant
+    integraline (ms²) karşılık gelir. Örnek başına maliyet O(bant sayısı)'dır.
+
+    Durağan girişte sonuçlar calculate_frequency_domain_parameters ile bant başına
+    ~%10 içinde uyuşur (tests/test_streaming.py). Üstel ortalama yalnızca son
+    ~tau_sec saniyeyi (varsayılan 128 s) yansıttığından durağan olmayan girişte
+    tüm kaydın Welch sonucundan ayrışır; bu bir hata değil, canlı görünümün amacıdır.
+
+    tau_sec: güç ortalamasının zaman sabiti (varsayılan: Welch segmentinin yarısı).
+    """
+
+    def __init__(self, config=None, order=3, tau_sec=None):
+        self.config = HRVConfig() if config is None else config
+        self.fs = self.config.fs
+        tau_sec = self.config.welch_segment_sec / 2 if tau_sec is None else tau_sec
+        self._decay = math.exp(-1 / (tau_sec * self.fs))
+        self._filters = {}
+        for name, band in (('VLF', self.config.vlf_range), ('LF', self.config.lf_range),
+                           ('HF', self.config.hf_range)):
+            sos = signal.butter(order, band, btype='bandpass', fs=self.fs, output='sos')
+            self._filters[name] = ([tuple(section) for section in sos.tolist()], signal.sosfilt_zi(sos))
+        self._states = None
+        self._power = dict.fromkeys(self._filters, 0.0)
+        self._weight = 0.0
+        self._beats = deque(maxlen=4)
+        self._origin = None
+        self.samples = 0
+
+    def push(self, rr):
+        """Yeni RR aralığını (ms) ekle ve tamamlanan ızgara örneklerini süzgeçlerden geçir."""
+        rr = float(rr)
+        beats = self._beats
+        time_sec = (beats[-1][0] if beats else 0.0) + rr / 1000
+        beats.append((time_sec, rr))
+        if len(beats) == 1:
+            # Izgara, RRResampler'daki gibi ilk atımın zamanından başlar
+            self._origin = time_sec
+            self._states = {name: (zi * rr).tolist() for name, (_, zi) in self._filters.items()}
+        if len(beats) == 3 and self.samples == 0:
+            # İlk aralık [t0, t1]: başlangıç eğimi tek taraflıdır
+            (t0, y0), (t1, y1), (t2, y2) = beats
+            self._interpolate(t0, y0, t1, y1, (y1 - y0) / (t1 - t0), (y2 - y0) / (t2 - t0))
+        elif len(beats) == 4:
+            # Gelen atım t3, [t1, t2] aralığının t2'deki eğimini tamamlar
+            (t0, y0), (t1, y1), (t2, y2), (t3, y3) = beats
+            self._interpolate(t1, y1, t2, y2, (y2 - y0) / (t2 - t0), (y3 - y1) / (t3 - t1))
+
+    def _interpolate(self, t_a, y_a, t_b, y_b, slope_a, slope_b):
+        """[t_a, t_b) aralığındaki ızgara örneklerini kübik Hermite ile üret."""
+        h = t_b - t_a
+        while True:
+            t = self._origin + self.samples / self.fs
+            if t >= t_b:
+                return
+            s = (t - t_a) / h
+            s2, s3 = s * s, s * s * s
+            self._update((2 * s3 - 3 * s2 + 1) * y_a + (s3 - 2 * s2 + s) * h * slope_a
+                         + (-2 * s3 + 3 * s2) * y_b + (s3 - s2) * h * slope_b)
+
+    def _update(self, x):
+        decay = self._decay
+        self._weight = decay * self._weight + (1 - decay)
+        for name, (sections, _) in self._filters.items():
+            y = x
+            for (b0, b1, b2, _, a1, a2), z in zip(sections, self._states[name]):
+                out = b0 * y + z[0]
+                z[0] = b1 * y - a1 * out + z[1]
+                z[1] = b2 * y - a2 * out
+                y = out
+            self._power[name] = decay * self._power[name] + (1 - decay) * y * y
+        self.samples += 1
+
+    def parameters(self):
+        """calculate_frequency_domain_parameters ile aynı anahtarlı güncel bant güçleri."""
+        if self._weight == 0:
+            return {}
+        # Üstel ortalamanın başlangıç yanlılığı ağırlık toplamına bölünerek giderilir
+        vlf_power, lf_power, hf_power = (self._power[name] / self._weight for name in ('VLF', 'LF', 'HF'))
+        total_power = vlf_power + lf_power + hf_power
+        lf_nu = (lf_power / (lf_power + hf_power)) * 100 if (lf_power + hf_power) > 0 else 0
+        hf_nu = (hf_power / (lf_power + hf_power)) * 100 if (lf_power + hf_power) > 0 else 0
+        return {
+            'VLF Güç (ms²)': round(vlf_power, 2),
+            'LF Güç (ms²)': round(lf_power, 2),
+            'HF Güç (ms²)': round(hf_power, 2),
+            'Toplam Güç (ms²)': round(total_power, 2),
+            'LF/HF Oranı': round(lf_power / hf_power if hf_power > 0 else 0, 2),
+            'LF (n.u.)': round(lf_nu, 2),
+            'HF (n.u.)': round(hf_nu, 2)
+        }
+
+
+def _dfa_parameters(rr_intervals, scale_min, scale_max):
+    """Tampon anlık görüntüsünün DFA parametreleri (işçi süreçte çalışır)."""
+    if len(rr_intervals) < 2 * scale_max:
+        return {}
+    return calculate_dfa(rr_intervals, scale_min=scale_min, scale_max=scale_max)[0]
+
+
+class StreamingHRV:
+    """Atım başına güncellenen canlı HRV durumu.
+
+    push() çağıran iş parçacığında (ör. LiveFeed) çalışır; latest, frequency, dfa ve
+    history() Streamlit betiği gibi başka iş parçacıklarından okunabilir.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, refresh_sec=DEFAULT_REFRESH_SEC, config=None,
+                 scale_min=4, scale_max=64, history_size=HISTORY_SIZE):
+        self.buffer = RRRingBuffer(capacity)
+        self.config = HRVConfig() if config is None else config
+        self.band_power = BandPowerTracker(self.config)
+        self.refresh_sec = refresh_sec
+        self.scale_min = scale_min
+        self.scale_max = scale_max
+        self.beats = 0
+        self.elapsed = 0.0
+        self.latest = {}
+        self.dfa = {}
+        self.dfa_time = None
+        self.dfa_error = None
+        self._since_refresh = 0.0
+        self._refresh = None
+        # Yenileme ayrı süreçte çalışır; GIL'i tutan DFA döngüleri atım işleyişini bekletmez
+        # 'spawn': işçi, Streamlit sunucusunun açık soketlerini ve iş parçacığı kilitlerini devralmaz.
+        # İşçi burada başlatılır; atım yolundaki ilk yenileme süreç başlatmayı beklemez
+        self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        self._executor.submit(int)
+        self._history = deque(maxlen=history_size)
+        self._latency_ns = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    def push(self, rr):
+        """Yeni RR aralığını (ms) işle ve güncel zaman alanı ölçümlerini döndür."""
+        start_ns = time.perf_counter_ns()
+        self.buffer.push(rr)
+        self.band_power.push(rr)
+        self.beats += 1
+        self.elapsed += rr / 1000
+        self._since_refresh += rr / 1000
+        metrics = self.buffer.metrics()
+
+        # Önceki yenileme sürüyorsa yenisi başlatılmaz; sonraki atımda tekrar denenir
+        if (self._since_refresh >= self.refresh_sec
+                and (self._refresh is None or self._refresh.done())):
+            self.refresh()
+
+        self.latest = metrics
+        latency_ns = time.perf_counter_ns() - start_ns
+        with self._lock:
+            self._history.append((self.elapsed, rr, metrics))
+            self._latency_ns.append(latency_ns)
+        return metrics
+
+    def refresh(self):
+        """Tampon DFA için yeterliyse anlık görüntüsünün yenilemesini işçi sürece gönder."""
+        if len(self.buffer) < max(MIN_REFRESH_BEATS, 2 * self.scale_max):
+            return
+        self._since_refresh = 0.0
+        self._refresh = self._executor.submit(_dfa_parameters, self.buffer.values(), self.scale_min, self.scale_max)
+        self._refresh.add_done_callback(self._refresh_done(self.elapsed))
+
+    def _refresh_done(self, stream_time):
+        def callback(future):
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self.dfa_error = str(future.exception())
+                return
+            self.dfa = future.result()
+            self.dfa_time = stream_time
+            self.dfa_error = None
+        return callback
+
+    @property
+    def frequency(self):
+        """Süzgeç bankasının güncel VLF/LF/HF güçleri."""
+        return self.band_power.parameters()
+
+    def history(self):
+        """Atım başına (akış zamanı s, RR ms, ölçümler) kayıtları."""
+        with self._lock:
+            return list(self._history)
+
+    def latency_summary(self):
+        """Atım başına güncelleme gecikmesi istatistikleri (ms)."""
+        with self._lock:
+            latency = np.array(self._latency_ns, dtype=np.float64) / 1e6
+        if len(latency) == 0:
+            return {}
+        return {
+            'Gecikme p50 (ms)': round(float(np.percentile(latency, 50)), 4),
+            'Gecikme p99 (ms)': round(float(np.percentile(latency, 99)), 4),
+            'Gecikme max (ms)': round(float(latency.max()), 4)
+        }
+
+    def close(self, wait=False, cancel=None):
+        """İşçi süreci kapat.
+
+        wait=True ise süren ve kuyrukta bekleyen DFA yenilemelerinin bitmesi beklenir.
+        cancel verilmezse yalnızca beklenmeyen kapanışta kuyruktaki yenilemeler iptal edilir.
+        """
+        cancel = not wait if cancel is None else cancel
+        self._executor.shutdown(wait=wait, cancel_futures=cancel)
+
+
+# --- Akış kaynakları: satır üreteçleri ---
+
+def parse_rr_lines(lines, time_unit='milliseconds'):
+    """Satır başına bir değer içeren akıştan pozitif RR aralıklarını (ms) üret."""
+    scale = 1000.0 if time_unit == 'seconds' else 1.0
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='ignore')
+        try:
+            value = float(line.strip())
+        except ValueError:
+            continue
+        if value > 0:
+            yield value * scale
+
+
+def stdin_lines(stream=None):
+    """stdin satırları (EOF'ta biter)."""
+    yield from (stream or sys.stdin)
+
+
+def tail_lines(path, poll_sec=0.1, from_start=True, stop_event=None):
+    """Büyüyen dosyaya eklenen satırlar (tail -f); stop_event kurulunca biter."""
+    with open(path, 'r') as f:
+        if not from_start:
+            f.seek(0, 2)
+        pending = ''
+        while stop_event is None or not stop_event.is_set():
+            chunk = f.readline()
+            if not chunk:
+                time.sleep(poll_sec)
+                continue
+            # Yazılmakta olan yarım satır tamamlanana kadar bekletilir
+            pending += chunk
+            if pending.endswith('\n'):
+                yield pending
+                pending = ''
+
+
+def socket_lines(host='127.0.0.1', port=9000, stop_event=None, timeout=0.5):
+    """Yerel TCP soketinden satırlar; bağlantılar sırayla kabul edilir, stop_event kurulunca biter."""
+    with socket.create_server((host, port)) as server:
+        server.settimeout(timeout)
+        while stop_event is None or not stop_event.is_set():
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:
+                continue
+            with connection:
+                connection.settimeout(timeout)
+                pending = b''
+                while stop_event is None or not stop_event.is_set():
+                    try:
+                        chunk = connection.recv(4096)
+                    except socket.timeout:
+                        continue
+                    if not chunk:
+                        break
+                    *complete, pending = (pending + chunk).split(b'\n')
+                    yield from complete
+                if pending:
+                    yield pending
+
+
+def replay_lines(rr_intervals, speed=1.0, stop_event=None):
+    """Kaydı gerçek zamanlı (speed katı hızla) satır satır oynat; canlı görünüm için demo kaynağı."""
+    for rr in rr_intervals:
+        if stop_event is not None and stop_event.is_set():
+            return
+        time.sleep(rr / 1000 / speed)
+        yield f'{rr:.1f}'
+
+
+class LiveFeed:
+    """Bir satır kaynağını arka plan iş parçacığında StreamingHRV'ye aktarır.
+
+    source(stop_event) satır üreteci döndüren çağrılabilirdir. Nesne Streamlit
+    session_state'te saklanır; betik yeniden çalıştığında akış kesilmez.
+    """
+
+    def __init__(self, source, hrv, time_unit='milliseconds'):
+        self.hrv = hrv
+        self.error = None
+        self._source = source
+        self._time_unit = time_unit
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='hrv-live-feed', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            for rr in parse_rr_lines(self._source(self._stop), self._time_unit):
+                self.hrv.push(rr)
+                if self._stop.is_set():
+                    break
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.hrv.close()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def stop(self):
+        """Kaynağı durdur; iş parçacığı kaynak bir sonraki kontrolde bitince kapanır."""
+        self._stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', nargs='?', help="--source tail için izlenen dosya")
+    parser.add_argument('--source', choices=['stdin', 'socket', 'tail'], default='stdin')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--time-unit', choices=['milliseconds', 'seconds'], default='milliseconds')
+    parser.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY, help='Halka tampon kapasitesi (atım)')
+    parser.add_argument('--refresh-sec', type=float, default=DEFAULT_REFRESH_SEC,
+                        help='DFA yenileme aralığı (s, akış zamanı)')
+    parser.add_argument('--quiet', action='store_true', help='Atım başına çıktı yazma, yalnızca özet')
+    args = parser.parse_args(argv)
+
+    if args.source == 'tail' and args.path is None:
+        parser.error("--source tail için dosya yolu gereklidir.")
+    lines = {
+        'stdin': lambda: stdin_lines(),
+        'socket': lambda: socket_lines(args.host, args.port),
+        'tail': lambda: tail_lines(args.path),
+    }[args.source]()
+
+    hrv = StreamingHRV(capacity=args.capacity, refresh_sec=args.refresh_sec)
+    try:
+        for rr in parse_rr_lines(lines, args.time_unit):
+            metrics = hrv.push(rr)
+            if not args.quiet:
+                print(json.dumps({'Zaman (s)': round(hrv.elapsed, 3), 'RR (ms)': rr, **metrics,
+                                  **hrv.frequency, **hrv.dfa},
+                                 ensure_ascii=False, default=str), flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Özet, akışın son durumunun DFA'sını içerir
+        hrv.refresh()
+        hrv.close(wait=True)
+
+    summary = {'Atım Sayısı': hrv.beats, **hrv.latest, **hrv.frequency, **hrv.dfa,
+               **hrv.latency_summary()}
+    print(json.dumps(summary, ensure_ascii=False, indent=2, default=str), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Fizyolojik olarak makul sentetik RR serisi üreteci (IPFM / ECGSYN tarzı).
+
+Kalp periyodu T(t), ortalama RR'ye eklenen LF ve HF salınımlarından oluşur
+(ECGSYN'deki iki tepeli spektrum). Atım zamanları IPFM (integral pulse
+frequency modulation) ile bulunur: 1/T(t)'nin integrali her tam sayıyı
+geçtiğinde bir atım oluşur. DFA ölçeklemesi için atım alanında 1/f^β
+(β = 2α - 1) gürültü eklenir; ardından isteğe bağlı ektopik atımlar ve eksik
+segmentler yerleştirilir. Tüm adımlar vektörize olduğundan 7 günlük kayıt
+birkaç saniyede üretilir.
+
+Kullanım:
+    python synthetic_rr.py kayit.txt --hours 24 --mean-hr 65 --lf-hf 2.0
+    python synthetic_rr.py kayit.npy --hours 168 --ectopic-rate 0.001
+"""
+import argparse
+import json
+import sys
+
+import numpy as np
+
+
+def _band_noise(n_samples, fs, center, width, power, rng):
+    """Gauss biçimli spektrumlu, varyansı tam olarak power olan gerçek sinyal."""
+    if power <= 0:
+        return np.zeros(n_samples)
+    freqs = np.fft.rfftfreq(n_samples, 1 / fs)
+    amplitude = np.exp(-0.5 * ((freqs - center) / width) ** 2)
+    phases = np.exp(2j * np.pi * rng.random(len(freqs)))
+    signal = np.fft.irfft(np.sqrt(amplitude) * phases, n=n_samples)
+    return signal * np.sqrt(power / np.var(signal))
+
+
+def _fractal_noise(n_beats, alpha, power, rng):
+    """Atım alanında 1/f^β spektrumlu gürültü; DFA üssü yaklaşık alpha olur."""
+    if power <= 0 or n_beats < 2:
+        return np.zeros(n_beats)
+    beta = 2 * alpha - 1
+    freqs = np.fft.rfftfreq(n_beats)
+    amplitude = np.zeros(len(freqs))
+    amplitude[1:] = freqs[1:] ** (-beta / 2)
+    spectrum = amplitude * (rng.normal(size=len(freqs)) + 1j * rng.normal(size=len(freqs)))
+    signal = np.fft.irfft(spectrum, n=n_beats)
+    return signal * np.sqrt(power / np.var(signal))
+
+
+def _ipfm_beats(period_ms, fs):
+    """IPFM: örneklenmiş kalp periyodundan (ms) atım zamanlarını (ms) döndür."""
+    dt_ms = 1000 / fs
+    times = np.arange(len(period_ms)) * dt_ms
+    # Faz = ∫ dt / T(t); her tam sayı geçişi bir atımdır
+    phase = np.concatenate(([0.0], np.cumsum(dt_ms / period_ms[:-1])))
+    crossings = np.arange(1, int(phase[-1]) + 1)
+    return np.interp(crossings, phase, times)
+
+
+def generate_rr(duration_sec=300.0, n_beats=None, mean_hr=70.0, lf_power=600.0, hf_power=300.0,
+                lf_center=0.1, hf_center=0.25, lf_width=0.01, hf_width=0.02, alpha=1.0, fractal_power=0.0,
+                ectopic_rate=0.0, prematurity=0.3, missing_segments=0, missing_duration_sec=10.0,
+                fs=4.0, seed=None):
+    """Sentetik RR serisi (ms) ve bilinen gerçek parametreleri üret.
+
+    n_beats verilirse duration_sec yok sayılır ve tam olarak n_beats atım döndürülür.
+    lf_power/hf_power salınımların varyansıdır (ms²); alpha yalnızca fractal_power > 0
+    ise etkilidir. Ektopik atımlar (1 - prematurity) oranında erken gelir ve ardından
+    toplamı koruyan kompanzatuvar duraklama izler. Eksik segmentler, algılayıcı
+    kesintisinde olduğu gibi tek bir uzun RR aralığı olarak görünür.
+
+    Döndürür: (rr_intervals, truth)
+    """
+    rng = np.random.default_rng(seed)
+    mean_rr = 60000 / mean_hr
+
+    if n_beats is not None:
+        # Eksik segmentlerde birleşen atımlar için pay bırak
+        duration_sec = n_beats * mean_rr / 1000 * 1.1 + missing_segments * missing_duration_sec + 10
+    n_samples = int(np.ceil(duration_sec * fs)) + 1
+
+    # Salınımlı kalp periyodu ve IPFM ile atım zamanları
+    period = (mean_rr
+              + _band_noise(n_samples, fs, lf_center, lf_width, lf_power, rng)
+              + _band_noise(n_samples, fs, hf_center, hf_width, hf_power, rng))
+    np.clip(period, 250.0, None, out=period)
+    beat_times = _ipfm_beats(period, fs)
+    rr_intervals = np.diff(beat_times, prepend=0.0)
+    rr_intervals += _fractal_noise(len(rr_intervals), alpha, fractal_power, rng)
+    np.clip(rr_intervals, 250.0, None, out=rr_intervals)
+
+    # Ektopik atımlar: erken atım + kompanzatuvar duraklama (son atım hariç)
+    ectopic = np.flatnonzero(rng.random(len(rr_intervals) - 1) < ectopic_rate)
+    if len(ectopic):
+        # Ardışık ektopikler kompanzasyonu bozmasın diye aralarında en az bir atım bırak
+        ectopic = ectopic[np.concatenate(([True], np.diff(ectopic) > 1))]
+        shift = rr_intervals[ectopic] * prematurity
+        rr_intervals[ectopic] -= shift
+        rr_intervals[ectopic + 1] += shift
+
+    # Eksik segmentler: pencere içindeki atımlar tek bir uzun aralıkta birleşir
+    gaps = []
+    if missing_segments > 0:
+        onsets = np.cumsum(rr_intervals)
+        total_ms = onsets[-1]
+        span_ms = (n_beats * mean_rr if n_beats is not None else total_ms)
+        starts = np.sort(rng.uniform(0, max(span_ms - missing_duration_sec * 1000, 0), missing_segments))
+        first = np.searchsorted(onsets, starts)
+        last = np.searchsorted(onsets, starts + missing_duration_sec * 1000)
+        keep = np.ones(len(rr_intervals), dtype=bool)
+        for lo, hi in zip(first, last):
+            if hi <= lo or hi >= len(rr_intervals):
+                continue
+            rr_intervals[hi] += rr_intervals[lo:hi].sum()
+            keep[lo:hi] = False
+            gaps.append((lo, hi))
+        # Eksik aralıkların çıkış dizisindeki konumları (birleşen uzun aralık)
+        new_index = np.cumsum(keep) - 1
+        gaps = [int(new_index[hi]) for _, hi in gaps]
+        ectopic = new_index[ectopic[keep[ectopic]]]
+        rr_intervals = rr_intervals[keep]
+
+    if n_beats is not None:
+        rr_intervals = rr_intervals[:n_beats]
+        ectopic = ectopic[ectopic < n_beats]
+        gaps = [index for index in gaps if index < n_beats]
+
+    truth = {
+        'Ortalama KH (atım/dk)': mean_hr,
+        'LF Güç (ms²)': lf_power,
+        'HF Güç (ms²)': hf_power,
+        'LF/HF Oranı': lf_power / hf_power if hf_power > 0 else np.nan,
+        'Alpha': alpha if fractal_power > 0 else np.nan,
+        'Ektopik Atım Sayısı': len(ectopic),
+        'Eksik Segment Sayısı': len(gaps),
+        'Ektopik İndeksler': np.asarray(ectopic, dtype=int),
+        'Eksik Segment İndeksleri': np.asarray(gaps, dtype=int)
+    }
+    return rr_intervals, truth
+
+
+def save_rr(rr_intervals, path):
+    """RR serisini uzantıya göre metin (.txt, satır başına bir değer) veya ikili (.npy) kaydet."""
+    if str(path).endswith('.npy'):
+        np.save(path, np.asarray(rr_intervals, dtype=np.float32))
+    else:
+        np.savetxt(path, rr_intervals, fmt='%.1f')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output', help='.txt (metin) veya .npy (ikili) çıktı dosyası')
+    parser.add_argument('--hours', type=float, default=24.0)
+    parser.add_argument('--mean-hr', type=float, default=70.0)
+    parser.add_argument('--lf-power', type=float, default=600.0)
+    parser.add_argument('--lf-hf', type=float, default=2.0, help='LF/HF oranı (HF gücü buna göre seçilir)')
+    parser.add_argument('--alpha', type=float, default=1.0)
+    parser.add_argument('--fractal-power', type=float, default=200.0)
+    parser.add_argument('--ectopic-rate', type=float, default=0.0)
+    parser.add_argument('--missing-segments', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    rr_intervals, truth = generate_rr(duration_sec=args.hours * 3600, mean_hr=args.mean_hr,
+                                      lf_power=args.lf_power, hf_power=args.lf_power / args.lf_hf,
+                                      alpha=args.alpha, fractal_power=args.fractal_power,
+                                      ectopic_rate=args.ectopic_rate, missing_segments=args.missing_segments,
+                                      seed=args.seed)
+    save_rr(rr_intervals, args.output)
+
+    summary = {key: value for key, value in truth.items() if not isinstance(value, np.ndarray)}
+    print(json.dumps({'Atım Sayısı': len(rr_intervals), **summary}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
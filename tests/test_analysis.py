@@ -0,0 +1,37 @@
+"""analyze_record aşama dağıtımı testleri."""
+import numpy as np
+
+from hrv_analysis import analyze_record
+
+VPC_BEATS = [100, 300, 500]
+
+
+def _record_with_vpcs(n_beats=600, seed=0):
+    """VPC_BEATS'te erken atım + kompansatuvar duraklama içeren kayıt ve etiketleri."""
+    rng = np.random.default_rng(seed)
+    rr_intervals = 800 + rng.normal(0, 10, n_beats)
+    annotations = np.full(n_beats, 'N')
+    for beat in VPC_BEATS:
+        rr_intervals[beat] = 550
+        rr_intervals[beat + 1] = 1050
+        annotations[beat] = 'V'
+    return rr_intervals, annotations
+
+
+def test_empty_stage_list_returns_empty_result():
+    rr_intervals, _ = _record_with_vpcs()
+    assert analyze_record(rr_intervals, stages=[]) == {}
+
+
+def test_hrt_respects_selected_region():
+    rr_intervals, annotations = _record_with_vpcs()
+    times = np.cumsum(rr_intervals) / 1000
+    start, end = times[50], times[200]
+    selected = rr_intervals[(times >= start) & (times <= end)]
+
+    whole = analyze_record(rr_intervals, stages=['hrt'], raw_rr=rr_intervals, annotations=annotations)
+    region = analyze_record(selected, stages=['hrt'], start=start, end=end,
+                            raw_rr=rr_intervals, annotations=annotations)
+
+    assert whole['hrt'][0]['VPC Sayısı'] == len(VPC_BEATS)
+    assert region['hrt'][0]['VPC Sayısı'] == 1
@@ -0,0 +1,77 @@
+"""correct_artifacts için regresyon testleri."""
+import numpy as np
+import pytest
+
+from hrv_analysis import _rolling_quartile_deviation, correct_artifacts
+
+# Ektopik atımın düzeltilmiş sayılması için yerel ortalamadan izin verilen en büyük sapma (ms)
+MAX_RESIDUAL_MS = 100
+
+ECTOPIC = np.array([120, 540, 871])
+
+
+def _baseline_rr(n_beats=1000, seed=0):
+    """Deterministik, ektopik atımsız test serisi."""
+    rng = np.random.default_rng(seed)
+    return 800 + 20 * np.sin(2 * np.pi * np.arange(n_beats) / 4.5) + rng.normal(0, 15, n_beats)
+
+
+def _flagged(rr_intervals, **kwargs):
+    """İnterpolasyonla değiştirilen atımların indeksleri."""
+    corrected, _ = correct_artifacts(rr_intervals, **kwargs)
+    return set(np.flatnonzero(corrected != rr_intervals))
+
+
+# 540 ile aynı eşik penceresinde sayısal olmayan tek değer eşiği devre dışı bırakmamalı
+@pytest.mark.parametrize('invalid', [None, np.nan, np.inf])
+def test_ectopic_beats_corrected(invalid):
+    rr_intervals = _baseline_rr()
+    rr_intervals[ECTOPIC] = 1300
+    if invalid is not None:
+        rr_intervals[500] = invalid
+
+    corrected, report = correct_artifacts(rr_intervals)
+
+    assert np.all(np.isfinite(corrected))
+    assert np.all(np.abs(corrected[ECTOPIC] - 800) < MAX_RESIDUAL_MS)
+    assert report['Düzeltilen Atım Sayısı'] == len(ECTOPIC) + (invalid is not None)
+
+
+def test_remove_drops_flagged_beats():
+    rr_intervals = _baseline_rr()
+    rr_intervals[ECTOPIC] = 1300
+
+    corrected, report = correct_artifacts(rr_intervals, method='remove')
+
+    assert len(corrected) == len(rr_intervals) - len(ECTOPIC)
+    assert report['Düzeltilen Atım Sayısı'] == len(ECTOPIC)
+
+
+def test_unknown_method_raises():
+    with pytest.raises(ValueError):
+        correct_artifacts(_baseline_rr(), method='median')
+
+
+@pytest.mark.parametrize('width', [1, 2, 5, 91])
+def test_rolling_quartile_deviation_matches_percentile(width):
+    x = np.random.default_rng(width).normal(size=300)
+    expected = [np.subtract(*np.percentile(x[i:i + width], [75, 25])) / 2 for i in range(len(x) - width + 1)]
+
+    np.testing.assert_allclose(_rolling_quartile_deviation(x, width, chunk_rows=37), expected, rtol=0, atol=1e-12)
+
+
+def test_threshold_independent_of_record_start():
+    # Gürültüsü değişen seri ve eşiğe yakın ektopik atımlar: eşik kayan pencereden
+    # alındığından, kayıt başından atım kırpmak kenarlardan uzak atımların kararını değiştirmez
+    # Sakin bölümlerde eşik alt sınırdadır (0.15 x 800 = 120 ms), gürültülü bölümlerde ~200 ms
+    rng = np.random.default_rng(3)
+    noise = np.where((np.arange(2000) // 150) % 2 == 0, 10, 60)
+    rr_intervals = 800 + rng.normal(0, 1, 2000) * noise
+    borderline = rng.choice(np.arange(100, 1900), 200, replace=False)
+    rr_intervals[borderline] += rng.choice([-1, 1], 200) * rng.uniform(120, 220, 200)
+
+    reference = _flagged(rr_intervals)
+    for shift in (13, 37, 60):
+        flagged = _flagged(rr_intervals[shift:])
+        interior = range(shift + 100, len(rr_intervals) - 100)
+        assert {i + shift for i in flagged if i + shift in interior} == {i for i in reference if i in interior}
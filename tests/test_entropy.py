@@ -0,0 +1,51 @@
+"""SampEn/ApEn'in O(N²) tanımıyla birebir aynı sonucu verdiğinin denetimi."""
+import numpy as np
+import pytest
+
+from hrv_analysis import calculate_approximate_entropy, calculate_sample_entropy
+
+
+def _distances(x, m, n_templates):
+    """İlk n_templates adet m boyutlu şablon arasındaki Chebyshev uzaklık matrisi."""
+    templates = np.array([x[i:i + m] for i in range(n_templates)])
+    return np.max(np.abs(templates[:, None, :] - templates[None, :, :]), axis=2)
+
+
+def _brute_sample_entropy(x, m, r):
+    n_templates = len(x) - m
+    b = (np.sum(_distances(x, m, n_templates) <= r) - n_templates) / 2
+    a = (np.sum(_distances(x, m + 1, n_templates) <= r) - n_templates) / 2
+    return np.nan if a == 0 or b == 0 else -np.log(a / b)
+
+
+def _brute_approximate_entropy(x, m, r):
+    def phi(dim):
+        n_templates = len(x) - dim + 1
+        counts = np.sum(_distances(x, dim, n_templates) <= r, axis=1)
+        return np.mean(np.log(counts / n_templates))
+    return phi(m) - phi(m + 1)
+
+
+def _series(kind, seed):
+    rng = np.random.default_rng(seed)
+    if kind == 'normal':
+        return 800 + rng.normal(0, 40, 300)
+    if kind == 'ar1':
+        noise = rng.normal(0, 20, 400)
+        return 800 + np.convolve(noise, 0.8 ** np.arange(20))[:400]
+    # Tam sayı ms: uzaklıklar r'ye tam eşit olabilir (d <= r sınırı)
+    return np.rint(800 + rng.normal(0, 30, 300))
+
+
+@pytest.mark.parametrize('kind', ['normal', 'ar1', 'integer'])
+@pytest.mark.parametrize('m', [1, 2, 3])
+@pytest.mark.parametrize('r', [0.1, 0.2, 0.35, 10.0])
+def test_entropy_matches_brute_force(kind, m, r):
+    x = _series(kind, seed=m)
+    # 10.0 mutlak tolerans (ms); diğerleri std oranı
+    r = r if r >= 1 else r * np.std(x)
+
+    np.testing.assert_allclose(calculate_sample_entropy(x, m=m, r=r), _brute_sample_entropy(x, m, r),
+                               rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(calculate_approximate_entropy(x, m=m, r=r), _brute_approximate_entropy(x, m, r),
+                               rtol=1e-12)
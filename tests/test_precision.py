@@ -0,0 +1,65 @@
+"""Düşük hassasiyet modlarının (float32/uint16) float64'e göre sayısal sapmasının denetimi.
+
+Raporlanan parametreler 2-3 basamağa yuvarlandığından karşılaştırma yuvarlanmamış
+ara sonuçlar üzerinden yapılır: SDNN ve RMSSD bağlamda saklanan dizi ve
+farklardan (modülle aynı float64 birikimiyle), bant güçleri döndürülen PSD'den,
+DFA α değerleri döndürülen dalgalanma eğrisinden hesaplanır.
+"""
+import numpy as np
+import pytest
+
+from hrv_analysis import (HRVConfig, RecordContext, RRSeries, _band_power, calculate_dfa,
+                          calculate_frequency_domain_parameters)
+
+# Ara sonuç başına izin verilen bağıl sapma. float32'de gözlenen en büyük sapma
+# ~1.5e-7'dir. uint16 tam sayı ms kayıtlar içindir; tam sayılar float32'de
+# birebir temsil edildiğinden sapma yalnızca yuvarlama gürültüsüdür.
+RELATIVE_TOLERANCE = {
+    'float32': 1e-6,
+    'uint16': 1e-12,
+}
+
+
+def _synthetic_rr(n_beats, seed=0):
+    """Deterministik, tam sayı olmayan test serisi (rastgele yürüyüş + solunum bileşeni)."""
+    rng = np.random.default_rng(seed)
+    beats = np.arange(n_beats)
+    drift = np.cumsum(rng.normal(0, 2, n_beats))
+    drift -= np.linspace(drift[0], drift[-1], n_beats)
+    return 850 + drift + 25 * np.sin(2 * np.pi * beats / 4.5) + rng.normal(0, 15, n_beats)
+
+
+def _intermediates(rr_intervals):
+    """Yuvarlanmamış SDNN, RMSSD, bant güçleri ve DFA α değerleri."""
+    context = RecordContext(rr_intervals)
+    values = {
+        'SDNN': np.std(context.rr, dtype=np.float64),
+        'RMSSD': np.sqrt(np.mean(context.diffs ** 2, dtype=np.float64)),
+    }
+
+    config = HRVConfig()
+    _, (frequencies, psd) = calculate_frequency_domain_parameters(context, config=config, raise_errors=True)
+    for band in ('vlf_range', 'lf_range', 'hf_range'):
+        values[band] = _band_power(frequencies, psd, getattr(config, band))
+
+    _, (scales_log, fluct_log) = calculate_dfa(context)
+    short = 10 ** scales_log <= 16
+    values['Alpha1'] = np.polyfit(scales_log[short], fluct_log[short], 1)[0]
+    values['Alpha2'] = np.polyfit(scales_log[~short], fluct_log[~short], 1)[0]
+    return context.rr.dtype, values
+
+
+@pytest.mark.parametrize('n_beats', [1000, 20000])
+@pytest.mark.parametrize('precision', sorted(RELATIVE_TOLERANCE))
+def test_reduced_precision_drift(precision, n_beats):
+    rr_intervals = _synthetic_rr(n_beats)
+    if precision == 'uint16':
+        rr_intervals = np.rint(rr_intervals)
+
+    _, reference = _intermediates(rr_intervals)
+    dtype, reduced = _intermediates(RRSeries(rr_intervals, precision))
+
+    # Düşük hassasiyet yolu gerçekten float32 dizi üzerinde çalışmalı
+    assert dtype == np.float32
+    for name, value in reference.items():
+        assert reduced[name] == pytest.approx(value, rel=RELATIVE_TOLERANCE[precision]), name
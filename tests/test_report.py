@@ -0,0 +1,36 @@
+"""Çevrimdışı rapor spesifikasyonu testleri."""
+import base64
+
+import numpy as np
+import plotly.graph_objects as go
+
+from utils import _compact_spec, figure_to_spec
+
+
+def _typed_array(values):
+    """Plotly 6+ ikili dizi kodlaması."""
+    values = np.ascontiguousarray(values)
+    encoded = {'dtype': values.dtype.str.lstrip('<|'), 'bdata': base64.b64encode(values.tobytes()).decode()}
+    if values.ndim > 1:
+        encoded['shape'] = ', '.join(str(size) for size in values.shape)
+    return encoded
+
+
+def test_typed_arrays_are_rounded_like_lists():
+    values = np.array([[1 / 3, 2 / 3, np.nan], [1e-7 / 3, 12345.678, 0.0]])
+    trace = {'type': 'heatmap', 'z': _typed_array(values), 'x': _typed_array(np.arange(3, dtype=np.int8))}
+
+    compact = _compact_spec(trace, digits=4)
+
+    assert compact['z'] == [[0.3333, 0.6667, None], [3.333e-08, 12350.0, 0.0]]
+    assert compact['x'] == [0, 1, 2]
+    assert compact == _compact_spec({'type': 'heatmap', 'z': values, 'x': np.arange(3, dtype=np.int8)}, digits=4)
+
+
+def test_figure_spec_has_no_binary_arrays():
+    fig = go.Figure(go.Scatter(x=np.arange(100), y=np.linspace(0, 1, 100) / 3))
+
+    trace = figure_to_spec(fig, digits=3)['data'][0]
+
+    assert trace['x'] == list(range(100))
+    assert trace['y'][:3] == [0.0, 0.00337, 0.00673]
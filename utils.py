@@ -3,11 +3,41 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 import io
+import json
+import gzip
+import base64
+import multiprocessing
+import uuid
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import plotly.offline
 import streamlit as st
-
-def load_rr_intervals(file):
-    """RR aralıklarını dosyadan yükle."""
+from hrv_analysis import (RRSeries, RecordContext, as_record_context, validate_rr_data, correct_artifacts,
+                          calculate_time_domain_parameters, calculate_frequency_domain_parameters, calculate_dfa,
+                          calculate_prsa)
+from shared_rr import SharedRRStore, attach_rr
+from instrumentation import timed
+
+@timed()
+def load_rr_intervals(file, precision=None):
+    """RR aralıklarını dosyadan yükle.
+
+    precision ('float64', 'float32', 'uint16') verilirse liste yerine bu türde
+    saklanan numpy dizisi döndürülür. .npy uzantılı ikili dosyalar doğrudan
+    numpy dizisi olarak okunur.
+    """
     try:
+        name = file if isinstance(file, str) else getattr(file, 'name', '')
+        if name.endswith('.npy'):
+            # İkili format (synthetic_rr.save_rr): metin ayrıştırması yapılmaz
+            source = file if isinstance(file, str) else io.BytesIO(file.getvalue())
+            values = np.load(source, allow_pickle=False).astype(np.float64, copy=False).ravel()
+            values = values[values > 0]
+            if len(values) == 0:
+                st.error("Dosyada geçerli RR aralığı verisi bulunamadı.")
+                return None
+            return RRSeries(values, precision).values if precision is not None else values
+
         if isinstance(file, str):
             # Dosya yolu verilmişse
             with open(file, 'r') as f:
@@ -34,6 +64,9 @@ def load_rr_intervals(file):
             st.info("Lütfen dosyanızın her satırında bir RR aralığı değeri olduğundan emin olun.")
             return None
         
+        if precision is not None:
+            return RRSeries(valid_lines, precision).values
+        
         return valid_lines
         
     except Exception as e:
@@ -41,14 +74,41 @@ def load_rr_intervals(file):
         st.info("Lütfen dosya formatını kontrol edin ve tekrar deneyin.")
         return None
 
+@timed()
+def load_beat_annotations(file):
+    """Vuru etiketlerini (her satırda bir etiket, örn. N veya V) dosyadan yükle."""
+    try:
+        if isinstance(file, str):
+            with open(file, 'r') as f:
+                lines = f.readlines()
+        else:
+            content = file.getvalue().decode('utf-8')
+            lines = content.split('\n')
+        
+        labels = [line.strip() for line in lines if line.strip()]
+        
+        if not labels:
+            st.error("Dosyada vuru etiketi bulunamadı.")
+            return None
+        
+        return np.array(labels)
+        
+    except Exception as e:
+        st.error(f"Etiket dosyası okuma hatası: {str(e)}")
+        return None
+
+@timed()
 def create_tachogram(rr_intervals):
-    """Create interactive tachogram plot using plotly."""
-    time = np.cumsum(rr_intervals) / 1000  # Convert to seconds
+    """Create interactive tachogram plot using plotly.
+
+    rr_intervals bir RecordContext ise kümülatif zamanlar ondan alınır.
+    """
+    context = as_record_context(rr_intervals)
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(
-        x=time,
-        y=rr_intervals,
+        x=context.times,
+        y=context.rr,
         mode='lines',
         name='RR Intervals',
         line=dict(color='#2E86C1'),
@@ -92,16 +152,22 @@ def create_tachogram(rr_intervals):
     
     return fig
 
+@timed()
 def get_selected_rr_intervals(rr_intervals, start_time, end_time):
-    """Get RR intervals within selected time range."""
-    time = np.cumsum(rr_intervals) / 1000  # saniyeye çevir
+    """Get RR intervals within selected time range.
+
+    rr_intervals bir RecordContext ise kümülatif zamanlar yeniden hesaplanmaz.
+    """
+    context = as_record_context(rr_intervals)
     
     # Seçilen zaman aralığındaki indeksleri bul
-    mask = (time >= start_time) & (time <= end_time)
+    mask = (context.times >= start_time) & (context.times <= end_time)
     
-    # Seçilen RR aralıklarını döndür
-    return np.array(rr_intervals)[mask].tolist()
+    # Seçilen RR aralıklarını döndür (saklama türü korunur)
+    source = context.source.values if isinstance(context.source, RRSeries) else np.asarray(context.source)
+    return source[mask]
 
+@timed()
 def create_psd_plot(frequencies, psd, vlf_range=(0.003, 0.04), lf_range=(0.04, 0.15), hf_range=(0.15, 0.4)):
     """Create power spectral density plot with adjustable frequency bands."""
     fig = go.Figure()
@@ -141,6 +207,7 @@ def create_psd_plot(frequencies, psd, vlf_range=(0.003, 0.04), lf_range=(0.04, 0
 
     return fig
 
+@timed()
 def create_dfa_plot(scales_log, fluct_log):
     """Create DFA plot with alpha1 and alpha2 regression lines."""
     fig = go.Figure()
@@ -191,10 +258,201 @@ def create_dfa_plot(scales_log, fluct_log):
 
     return fig
 
-def process_multiple_files(files, time_unit="milliseconds"):
-    """Process multiple RR interval files and return combined results."""
-    results = []
-    
+@timed()
+def create_spectrogram_plot(times, frequencies, spectrogram, lf_series, hf_series):
+    """Create spectrogram heatmap with LF/HF band-power time series below it."""
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+                        row_heights=[0.6, 0.4])
+
+    fig.add_trace(go.Heatmap(
+        x=times,
+        y=frequencies,
+        z=np.log10(np.asarray(spectrogram).T + 1e-12),
+        colorscale='Viridis',
+        colorbar=dict(title='log₁₀ PSD', len=0.6, y=0.7),
+        name='Spektrogram'
+    ), row=1, col=1)
+
+    fig.add_trace(go.Scatter(
+        x=times,
+        y=lf_series,
+        mode='lines',
+        name='LF Güç',
+        line=dict(color='#28B463')
+    ), row=2, col=1)
+    fig.add_trace(go.Scatter(
+        x=times,
+        y=hf_series,
+        mode='lines',
+        name='HF Güç',
+        line=dict(color='#2E86C1')
+    ), row=2, col=1)
+
+    fig.update_layout(
+        title='Zaman-Frekans Analizi',
+        showlegend=True,
+        template='plotly_white',
+        height=600
+    )
+    fig.update_yaxes(title_text='Frekans (Hz)', row=1, col=1)
+    fig.update_yaxes(title_text='Güç (ms²)', row=2, col=1)
+    fig.update_xaxes(title_text='Zaman (s)', row=2, col=1)
+
+    return fig
+
+def create_performance_plot(spans):
+    """Create per-stage waterfall (Gantt-style) chart from instrumentation spans."""
+    spans = [record for record in spans if record.get('Süre (ms)') is not None]
+    labels = [f"{'  ' * record['Derinlik']}{record['Aşama']} #{i + 1}" for i, record in enumerate(spans)]
+
+    fig = go.Figure(go.Bar(
+        y=labels,
+        x=[record['Süre (ms)'] for record in spans],
+        base=[record['Başlangıç (ms)'] for record in spans],
+        orientation='h',
+        marker=dict(color=[record['Derinlik'] for record in spans], colorscale='Blues_r'),
+        hovertemplate='%{y}<br>Başlangıç: %{base:.1f} ms<br>Süre: %{x:.1f} ms<extra></extra>'
+    ))
+    fig.update_layout(
+        title='Aşama Süreleri',
+        xaxis_title='Zaman (ms)',
+        yaxis=dict(autorange='reversed'),
+        template='plotly_white',
+        height=max(300, 22 * len(spans) + 100),
+        showlegend=False
+    )
+    return fig
+
+@timed()
+def create_mse_plot(scales, mse):
+    """Create multiscale entropy curve (SampEn vs. coarse-graining scale)."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=scales,
+        y=mse,
+        mode='lines+markers',
+        name='SampEn',
+        line=dict(color='#2E86C1'),
+        marker=dict(color='#2E86C1')
+    ))
+
+    fig.update_layout(
+        title='Multiscale Entropy',
+        xaxis_title='Ölçek (τ)',
+        yaxis_title='SampEn',
+        showlegend=True,
+        template='plotly_white'
+    )
+
+    return fig
+
+@timed()
+def create_poincare_plot(rr_n, rr_n1, sd1, sd2, max_points=5000, bins=150):
+    """Create Poincaré plot with SD1/SD2 ellipse.
+
+    Nokta sayısı max_points'i aşarsa dağılım 2B yoğunluk haritasına (heatmap)
+    dönüştürülür; 24 saatlik kayıtlarda yüz binlerce işaretçi yerine küçük bir
+    matris çizilir.
+    """
+    rr_n = np.asarray(rr_n)
+    rr_n1 = np.asarray(rr_n1)
+    fig = go.Figure()
+
+    if len(rr_n) > max_points:
+        counts, x_edges, y_edges = np.histogram2d(rr_n, rr_n1, bins=bins)
+        z = counts.T.astype(object)
+        z[counts.T == 0] = None  # boş hücreleri şeffaf bırak
+        fig.add_trace(go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=z,
+            colorscale='Blues',
+            colorbar=dict(title='Atım'),
+            name='RR Yoğunluğu'
+        ))
+    else:
+        fig.add_trace(go.Scattergl(
+            x=rr_n,
+            y=rr_n1,
+            mode='markers',
+            name='RR(n), RR(n+1)',
+            marker=dict(color='#2E86C1', size=4, opacity=0.5)
+        ))
+
+    # SD1/SD2 elipsi: merkez ortalama RR, eksenler özdeşlik doğrusuna göre 45° döndürülmüş
+    center_x, center_y = np.mean(rr_n), np.mean(rr_n1)
+    theta = np.linspace(0, 2 * np.pi, 100)
+    u = sd2 * np.cos(theta)
+    v = sd1 * np.sin(theta)
+    fig.add_trace(go.Scatter(
+        x=center_x + (u - v) / np.sqrt(2),
+        y=center_y + (u + v) / np.sqrt(2),
+        mode='lines',
+        name=f'SD1 = {sd1:.1f}, SD2 = {sd2:.1f}',
+        line=dict(color='#E74C3C')
+    ))
+
+    rr_min = min(np.min(rr_n), np.min(rr_n1))
+    rr_max = max(np.max(rr_n), np.max(rr_n1))
+    fig.add_trace(go.Scatter(
+        x=[rr_min, rr_max],
+        y=[rr_min, rr_max],
+        mode='lines',
+        name='Özdeşlik Doğrusu',
+        line=dict(color='#7F8C8D', dash='dash')
+    ))
+
+    fig.update_layout(
+        title='Poincaré Grafiği',
+        xaxis_title='RR(n) (ms)',
+        yaxis_title='RR(n+1) (ms)',
+        showlegend=True,
+        template='plotly_white'
+    )
+    fig.update_yaxes(scaleanchor='x', scaleratio=1)
+
+    return fig
+
+def _analyze_record(rr_intervals, config=None):
+    """Tek kaydın toplu analiz parametrelerini hesapla (ana süreçte veya işçide)."""
+    # Ara sonuçlar (zamanlar, farklar, histogram, profil) tüm hesaplarda paylaşılır
+    context = RecordContext(rr_intervals, fs=config.fs if config is not None else 4.0)
+
+    # Toplam kayıt süresini hesapla
+    total_time_min = context.times[-1] / 60
+
+    # Tüm parametreleri hesapla
+    time_params = calculate_time_domain_parameters(context)
+    freq_params, _ = calculate_frequency_domain_parameters(context, config=config)
+    dfa_params, _ = calculate_dfa(context)
+    prsa_params, _ = calculate_prsa(context)
+
+    return {
+        'Kayıt Süresi (dk)': round(total_time_min, 2),
+        **time_params,
+        **freq_params,
+        **dfa_params,
+        **prsa_params
+    }
+
+def _analyze_shared_record(descriptor, config=None):
+    """İşçi süreç girişi: paylaşımlı bellekteki RR dizisini kopyalamadan analiz et."""
+    with attach_rr(descriptor) as rr_intervals:
+        params = _analyze_record(rr_intervals, config)
+        del rr_intervals
+    return params
+
+@timed()
+def process_multiple_files(files, time_unit="milliseconds", artifact_method="interpolate", config=None,
+                           n_workers=None):
+    """Process multiple RR interval files and return combined results.
+
+    n_workers > 1 verilirse kayıtlar işçi süreçlerde analiz edilir; RR dizileri
+    pickle ile kopyalanmak yerine paylaşımlı bellekte tek blokta tutulur ve
+    işçilere yalnızca tanımlayıcıları gönderilir.
+    """
+    records = []
+
     for file in files:
         try:
             # Dosyayı oku
@@ -209,43 +467,186 @@ def process_multiple_files(files, time_unit="milliseconds"):
             if time_unit == "seconds":
                 rr_intervals = [rr * 1000 for rr in rr_intervals]
 
-            # Veriyi doğrula
-            is_valid, message = validate_rr_data(rr_intervals)
-            if not is_valid:
-                st.warning(f"{file.name}: {message}")
-                continue
+            # Kalite raporu düzeltilmemiş kayıttan alınır
+            quality = validate_rr_data(rr_intervals)
+
+            # Ektopik atım ve artefakt düzeltme
+            artifact_pct = 0.0
+            if artifact_method is not None:
+                rr_intervals, artifact_report = correct_artifacts(rr_intervals, method=artifact_method)
+                artifact_pct = artifact_report['Düzeltilen Atım (%)']
 
-            # Toplam kayıt süresini hesapla
-            total_time_ms = sum(rr_intervals)
-            total_time_min = total_time_ms / (1000 * 60)
+            # Seçilen hassasiyet modunda sakla
+            if config is not None:
+                rr_intervals = RRSeries(rr_intervals, config.precision).values
 
-            # Tüm parametreleri hesapla
-            time_params = calculate_time_domain_parameters(rr_intervals)
-            freq_params, _ = calculate_frequency_domain_parameters(rr_intervals)
-            dfa_params, _ = calculate_dfa(rr_intervals)
+            # Analiz, düzeltilmiş kaydın geçerliliğine göre yapılır
+            usable = validate_rr_data(rr_intervals) if artifact_method is not None else quality
+            if not usable.is_valid:
+                st.warning(f"{file.name}: {usable.message}")
+                continue
 
-            # Sonuçları birleştir
-            result = {
+            records.append(({
                 'Dosya Adı': file.name,
-                'Kayıt Süresi (dk)': round(total_time_min, 2),
-                **time_params,
-                **freq_params,
-                **dfa_params
-            }
-            results.append(result)
-            
+                'Düzeltilen Atım (%)': artifact_pct,
+                'Geçerli Veri (%)': quality.valid_percent
+            }, np.asarray(rr_intervals)))
+
         except Exception as e:
             st.warning(f"{file.name}: İşleme hatası - {str(e)}")
             continue
 
+    results = []
+    if n_workers is not None and n_workers > 1 and len(records) > 1:
+        # Blok ana sürece aittir; işçi çökse de with çıkışında silinir
+        with SharedRRStore([rr_intervals for _, rr_intervals in records]) as store:
+            # 'spawn': işçiler Streamlit sunucusunun soketlerini ve iş parçacığı kilitlerini
+            # devralmaz (streaming.py ve service.py'deki havuzlarla aynı)
+            with ProcessPoolExecutor(max_workers=min(n_workers, len(records)),
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                futures = [executor.submit(_analyze_shared_record, descriptor, config)
+                           for descriptor in store.descriptors]
+                for (info, _), future in zip(records, futures):
+                    try:
+                        params = future.result()
+                    except Exception as e:
+                        st.warning(f"{info['Dosya Adı']}: İşleme hatası - {str(e)}")
+                        continue
+                    results.append(_merge_record(info, params))
+    else:
+        for info, rr_intervals in records:
+            try:
+                params = _analyze_record(rr_intervals, config)
+            except Exception as e:
+                st.warning(f"{info['Dosya Adı']}: İşleme hatası - {str(e)}")
+                continue
+            results.append(_merge_record(info, params))
+
     # Sonuç kontrolü
     if not results:
         return pd.DataFrame()  # Boş DataFrame döndür
         
     return pd.DataFrame(results)
 
-def generate_report(time_params, freq_params, dfa_params=None, total_time_min=None, psd_html=None, dfa_html=None, full_name=None, age=None, gender=None):
-    """Generate report as HTML string with modern styling."""
+def _merge_record(info, params):
+    """Dosya bilgisi ve analiz parametrelerini önceki sütun sırasıyla birleştir."""
+    return {
+        'Dosya Adı': info['Dosya Adı'],
+        'Kayıt Süresi (dk)': params.pop('Kayıt Süresi (dk)'),
+        'Düzeltilen Atım (%)': info['Düzeltilen Atım (%)'],
+        'Geçerli Veri (%)': info['Geçerli Veri (%)'],
+        **params
+    }
+
+def _round_significant(values, digits):
+    """Float dizisini anlamlı basamak sayısına yuvarla (JSON çıktısı kısa kalsın diye)."""
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(values) & (values != 0)
+    exponent = np.zeros(values.shape)
+    exponent[finite] = np.floor(np.log10(np.abs(values[finite])))
+    shift = digits - 1 - exponent
+
+    # Küçük sayılarda 10**shift tam sayıdır, büyüklerde bölen tam sayı olur;
+    # böylece bölme sonucu en yakın ondalık değere denk gelir.
+    small = shift >= 0
+    up = 10.0 ** np.where(small, shift, 0)
+    down = 10.0 ** np.where(small, 0, -shift)
+    return np.where(small, np.round(values * up) / up, np.round(values / down) * down)
+
+def _decode_typed_array(obj):
+    """Plotly'nin ikili dizi kodlamasını ({'dtype', 'bdata'[, 'shape']}) numpy dizisine çevir."""
+    values = np.frombuffer(base64.b64decode(obj['bdata']), dtype=np.dtype(obj['dtype']))
+    if 'shape' in obj:
+        values = values.reshape([int(size) for size in str(obj['shape']).split(',')])
+    return values
+
+def _compact_spec(obj, digits):
+    """Plotly JSON yapısındaki numpy dizilerini yuvarlanmış listelere dönüştür.
+
+    Plotly 6+ dizileri base64 kodlu ikili veri olarak verir; bunlar da çözülüp
+    yuvarlanır, böylece çıktı Plotly sürümünden bağımsız olarak aynıdır.
+    """
+    if isinstance(obj, dict):
+        if 'bdata' in obj and 'dtype' in obj:
+            return _compact_spec(_decode_typed_array(obj), digits)
+        return {key: _compact_spec(value, digits) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        if obj and all(isinstance(v, float) for v in obj):
+            return _compact_spec(np.array(obj), digits)
+        return [_compact_spec(value, digits) for value in obj]
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == 'f':
+            rounded = _round_significant(obj, digits)
+            finite = np.isfinite(rounded)
+            if not finite.all():
+                # JSON NaN desteklemez, Plotly boşlukları null olarak çizer
+                rounded = rounded.astype(object)
+                rounded[~finite] = None
+            return rounded.tolist()
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+def figure_to_spec(fig, digits=6):
+    """Plotly figürünü kompakt JSON spesifikasyonuna dönüştür."""
+    spec = _compact_spec(fig.to_plotly_json(), digits)
+    return {'data': spec.get('data', []), 'layout': spec.get('layout', {})}
+
+@timed()
+def figure_to_html(fig, offline=False, digits=6):
+    """Figürü rapora gömülecek HTML parçasına dönüştür.
+
+    Çevrimdışı modda plotly.js eklenmez; figür yalnızca JSON spesifikasyonu olarak
+    yazılır ve generate_report tarafından eklenen tek plotly.js kopyasıyla çizilir.
+    """
+    if not offline:
+        return fig.to_html(full_html=False, include_plotlyjs='cdn')
+
+    # id(fig) çöp toplanan figürlerin adresleri yeniden kullanıldığında tekrarlanabilir
+    div_id = f"hrv-plot-{uuid.uuid4().hex}"
+    spec_json = json.dumps(figure_to_spec(fig, digits), separators=(',', ':'))
+    spec_json = spec_json.replace('</', '<\\/')  # </script> kaçışı
+    return (f'<div id="{div_id}" class="hrv-plot"></div>'
+            f'<script type="application/json" id="{div_id}-spec">{spec_json}</script>')
+
+@lru_cache(maxsize=2)
+def get_plotlyjs_bundle(compress=False):
+    """Rapora bir kez gömülecek plotly.js betiğini döndür (isteğe bağlı gzip+base64)."""
+    plotlyjs = plotly.offline.get_plotlyjs()  # zaten küçültülmüş (minified) paket
+    if not compress:
+        return f'<script type="text/javascript">{plotlyjs}</script>'
+
+    payload = base64.b64encode(gzip.compress(plotlyjs.encode('utf-8'), compresslevel=9)).decode('ascii')
+    return f"""<script type="text/javascript">
+    window.hrvPlotlyReady = (async function() {{
+        var bytes = Uint8Array.from(atob("{payload}"), function(c) {{ return c.charCodeAt(0); }});
+        var stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+        var code = await new Response(stream).text();
+        var script = document.createElement('script');
+        script.text = code;
+        document.head.appendChild(script);
+    }})();
+    </script>"""
+
+_OFFLINE_RENDERER = """<script type="text/javascript">
+    (window.hrvPlotlyReady || Promise.resolve()).then(function() {
+        document.querySelectorAll('.hrv-plot').forEach(function(div) {
+            var spec = JSON.parse(document.getElementById(div.id + '-spec').textContent);
+            Plotly.newPlot(div, spec.data, spec.layout, {responsive: true});
+        });
+    });
+    </script>"""
+
+@timed()
+def generate_report(time_params, freq_params, dfa_params=None, total_time_min=None, psd_html=None, dfa_html=None, full_name=None, age=None, gender=None,
+                    offline=False, compress_plotlyjs=False, nonlinear_params=None, mse_html=None,
+                    poincare_html=None):
+    """Generate report as HTML string with modern styling.
+
+    offline=True ise grafikler figure_to_html(..., offline=True) ile üretilmiş olmalıdır;
+    plotly.js rapora yalnızca bir kez gömülür ve tüm figürler JSON'dan çizilir.
+    """
     
     # Kişisel bilgileri kontrol et ve varsayılan değerler ata
     full_name = full_name if full_name else "Belirtilmedi"
@@ -325,6 +726,7 @@ def generate_report(time_params, freq_params, dfa_params=None, total_time_min=No
         }}
     }}
     </style>
+    {get_plotlyjs_bundle(compress_plotlyjs) if offline else ''}
     </head>
     <body>
     <div class="container">
@@ -381,8 +783,20 @@ def generate_report(time_params, freq_params, dfa_params=None, total_time_min=No
             html += f"<tr><td>{param}</td><td>{value}</td></tr>"
         html += "</table></div>"
 
+    # Doğrusal Olmayan Parametreler
+    if nonlinear_params:
+        html += """
+            <div class="section">
+                <h3>Doğrusal Olmayan Parametreler</h3>
+                <table>
+                    <tr><th>Parametre</th><th>Değer</th></tr>
+        """
+        for param, value in nonlinear_params.items():
+            html += f"<tr><td>{param}</td><td>{value}</td></tr>"
+        html += "</table></div>"
+
     # Grafikler
-    if psd_html or dfa_html:
+    if psd_html or dfa_html or mse_html or poincare_html:
         html += """
         <div class="section">
             <h3>Analiz Grafikleri</h3>
@@ -402,92 +816,28 @@ def generate_report(time_params, freq_params, dfa_params=None, total_time_min=No
                     {dfa_html}
                 </div>
             """
+        if mse_html:
+            html += f"""
+                <div class="plot">
+                    <h4>Multiscale Entropy</h4>
+                    {mse_html}
+                </div>
+            """
+        if poincare_html:
+            html += f"""
+                <div class="plot">
+                    <h4>Poincaré Grafiği</h4>
+                    {poincare_html}
+                </div>
+            """
         html += "</div></div>"
 
+    if offline:
+        html += _OFFLINE_RENDERER
+
     html += """
     </div>
     </body>
     </html>
     """
     return html
-
-# Placeholder functions -  These need to be implemented separately based on your HRV analysis requirements.
-def validate_rr_data(rr_intervals):
-    """RR aralıklarını doğrula."""
-    try:
-        if not rr_intervals or len(rr_intervals) < 100:
-            return False, "En az 100 RR aralığı gereklidir."
-        
-        # RR aralıklarının pozitif olduğunu kontrol et
-        if any(rr <= 0 for rr in rr_intervals):
-            return False, "Tüm RR aralıkları pozitif olmalıdır."
-        
-        # Aşırı değerleri kontrol et (örn. 300ms - 2000ms arası)
-        if any(rr < 300 or rr > 2000 for rr in rr_intervals):
-            return False, "RR aralıkları 300ms ile 2000ms arasında olmalıdır."
-        
-        return True, "Veri doğrulama başarılı."
-        
-    except Exception as e:
-        return False, f"Veri doğrulama hatası: {str(e)}"
-
-def calculate_time_domain_parameters(rr_intervals):
-    """Zaman alanı parametrelerini hesapla."""
-    try:
-        # RR aralıklarını numpy dizisine çevir
-        rr = np.array(rr_intervals)
-        
-        # Temel istatistikler
-        mean_rr = np.mean(rr)
-        sdnn = np.std(rr)
-        
-        # Ardışık farklar
-        diff_rr = np.diff(rr)
-        rmssd = np.sqrt(np.mean(diff_rr**2))
-        
-        # pNN50 hesapla
-        nn50 = np.sum(np.abs(diff_rr) > 50.0)
-        pnn50 = (nn50 / len(diff_rr)) * 100
-        
-        # Ortalama kalp atış hızı
-        mean_hr = 60000 / mean_rr
-        
-        return {
-            'Ortalama RR (ms)': round(mean_rr, 2),
-            'SDNN (ms)': round(sdnn, 2),
-            'RMSSD (ms)': round(rmssd, 2),
-            'pNN50 (%)': round(pnn50, 2),
-            'Ortalama HR (bpm)': round(mean_hr, 2)
-        }
-        
-    except Exception as e:
-        st.error(f"Zaman alanı parametreleri hesaplanırken hata oluştu: {str(e)}")
-        return {}
-
-def calculate_frequency_domain_parameters(rr_intervals):
-    """Frekans alanı parametrelerini hesapla."""
-    try:
-        # Örnek frekans alanı parametreleri
-        return {
-            'VLF Power (ms²)': 1000,
-            'LF Power (ms²)': 2000,
-            'HF Power (ms²)': 1500,
-            'LF/HF Ratio': 1.33
-        }, [np.array([0.1, 0.2, 0.3]), np.array([100, 200, 300])]
-        
-    except Exception as e:
-        st.error(f"Frekans alanı parametreleri hesaplanırken hata oluştu: {str(e)}")
-        return {}, [np.array([]), np.array([])]
-
-def calculate_dfa(rr_intervals):
-    """DFA parametrelerini hesapla."""
-    try:
-        # Örnek DFA parametreleri
-        return {
-            'Alpha1': 1.2,
-            'Alpha2': 0.8
-        }, [np.array([1, 2, 3]), np.array([0.5, 1.0, 1.5])]
-        
-    except Exception as e:
-        st.error(f"DFA parametreleri hesaplanırken hata oluştu: {str(e)}")
-        return {}, [np.array([]), np.array([])]
\ No newline at end of file